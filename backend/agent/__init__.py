@@ -2,7 +2,7 @@
 
 from __future__ import annotations
 import os, json, datetime as dt
-from typing import List, Dict, Any, Literal
+from typing import List, Dict, Any, Literal, Callable
 from zoneinfo import ZoneInfo
 
 from sqlalchemy.orm import Session
@@ -61,6 +61,15 @@ _llm = ChatOpenAI(
     async_client=_AsyncChat(),
 )
 
+# /chat/stream 용 — streaming=True 로 토큰이 생성되는 대로 콜백(on_llm_new_token)에 전달됨
+_stream_llm = ChatOpenAI(
+    model="gpt-3.5-turbo",
+    temperature=0.2,
+    streaming=True,
+    client=_SyncChat(),
+    async_client=_AsyncChat(),
+)
+
 # ✅ [수정] 플래너 전용 LLM을 여기서 중앙 관리합니다.
 _planner_llm = ChatOpenAI(
     model="gpt-4o-mini",
@@ -225,6 +234,7 @@ def build_agent(
     user: models.User,
     tz: ZoneInfo = ZoneInfo("UTC"),
     history: list[models.Message] | None = None,
+    streaming: bool = False,          # True 면 토큰 스트리밍 LLM 사용 (/chat/stream)
 ) -> AgentExecutor:
     # 1) Memory – 토큰 기반 윈도우 (≈ 1 200 tokens)
     memory = ConversationTokenBufferMemory(
@@ -243,7 +253,7 @@ def build_agent(
     prompt = build_prompt(tools, tz)
 
     # 3) agent → executor
-    agent = create_openai_tools_agent(_llm, tools, prompt)
+    agent = create_openai_tools_agent(_stream_llm if streaming else _llm, tools, prompt)
     exec_   = AgentExecutor(
         agent   = agent,
         tools   = tools,
@@ -276,9 +286,12 @@ def run_lcel_once(
     tz: ZoneInfo,
     history: list[models.Message] | None = None,
     user_input: str | None = None,
+    on_event: Callable[[str, dict], None] | None = None,
 ) -> dict:
     """
-    LLM이 계획을 세우고(Plan), 각 단계를 순차적으로 실행(Execute)합니다.
+    LLM이 계획을 세우고(Plan), 각 단계를 의존 관계(DAG)에 따라 실행(Execute)합니다.
+    서로 독립인 단계는 PLAN_MAX_CONCURRENCY 한도 안에서 동시에 실행됩니다.
+    on_event(name, data) 를 넘기면 plan / step_started / step_finished 진행 상황을 알립니다 (SSE 용).
     """
     # ── 0) 입력 확정 ──────────────────────────────────────
     if user_input is None:
@@ -348,6 +361,8 @@ def run_lcel_once(
         print(f"[VALIDATOR ERROR] {ve}")
 
     print("\n📝 2. PARSED PLAN:\n", json.dumps(plan, indent=2, ensure_ascii=False))
+    if on_event:
+        on_event("plan", {"steps": plan.get("steps", [])})
 
     # ── 2) 단계별 실행 (Executor 사용) ───────────────────
     step_executor = StepExecutor(db, user, tz, _planner_llm, _sync_root)
@@ -358,11 +373,8 @@ def run_lcel_once(
     if not plan.get("steps"):
         print("\n🤷 NO STEPS TO EXECUTE. Returning default response.")
     else:
-        for idx, step in enumerate(plan.get("steps", [])):
-            result = step_executor.execute_step(step, step_outputs)
-            step_key = f"step_{idx + 1}_output"
-            step_outputs[step_key] = result.get("output", "")
-            logs.append(result)
+        # {{step_N_output}} 의존 관계가 없는 스텝끼리는 동시에 실행
+        step_outputs, logs = step_executor.execute_plan(plan["steps"], on_event=on_event)
 
     print("=" * 70 + "\n")
 
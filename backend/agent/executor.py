@@ -1,8 +1,44 @@
 # backend/agent/executor.py
 
-import re
+import os, re, threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from .tools import make_toolset
 
+PLACEHOLDER_RE = re.compile(r"\{\{([\w_]+)\}\}")
+STEP_REF_RE    = re.compile(r"^step_(\d+)_output$")
+
+# 동시에 실행할 스텝 수 상한 (환경변수로 조정)
+PLAN_MAX_CONCURRENCY = int(os.getenv("PLAN_MAX_CONCURRENCY", "4"))
+
+# 같은 DB 세션/캘린더를 만지는 도구 → 서로 동시에 돌지 않도록 잠금
+DB_BOUND_TOOLS = {"create_event", "delete_event", "fetch_recommendations"}
+# 부수효과가 있는 도구 → 앞선 모든 스텝이 끝난 뒤에만 실행 (기존 순차 실행 의미 보존)
+BARRIER_TOOLS = {"create_event", "delete_event"}
+
+
+def step_dependencies(steps: list[dict]) -> list[set[int]]:
+    """
+    각 스텝의 args 안 {{step_N_output}} 플레이스홀더를 읽어 의존 스텝(0-based) 집합을 만든다.
+    - 자기 자신 이후의 스텝을 가리키는 참조는 무시 (순차 실행 때도 치환되지 않던 값)
+    - BARRIER_TOOLS 는 앞선 모든 스텝에 의존
+    """
+    deps: list[set[int]] = []
+    for idx, step in enumerate(steps):
+        if step.get("tool") in BARRIER_TOOLS:
+            deps.append(set(range(idx)))
+            continue
+        found: set[int] = set()
+        for value in (step.get("args") or {}).values():
+            if not isinstance(value, str):
+                continue
+            for name in PLACEHOLDER_RE.findall(value):
+                m = STEP_REF_RE.match(name)
+                if m and 1 <= int(m.group(1)) <= idx:
+                    found.add(int(m.group(1)) - 1)
+        deps.append(found)
+    return deps
+
+
 class StepExecutor:
     """
     플래너가 생성한 계획의 단일 스텝(step)을 실행하는 역할.
@@ -13,11 +49,12 @@ class StepExecutor:
             tool.name: tool for tool in make_toolset(db, user, tz, openai_client, llm)
         }
         self.llm = llm
+        self._db_lock = threading.Lock()
 
     def _replace_placeholders(self, arg_value: str, previous_step_outputs: dict) -> str:
         """문자열 내의 모든 {{step_N_output}} 플레이스홀더를 실제 값으로 치환합니다."""
-        placeholders = re.findall(r"\{\{([\w_]+)\}\}", arg_value)
-        
+        placeholders = PLACEHOLDER_RE.findall(arg_value)
+
         for placeholder in placeholders:
             if placeholder in previous_step_outputs:
                 replacement_value = str(previous_step_outputs[placeholder])
@@ -51,9 +88,13 @@ class StepExecutor:
              print(f"  - ⚙️ Processed Args: {processed_args}")
 
         tool_to_run = self.tools_by_name[tool_name]
-        
+
         try:
-            result = tool_to_run.invoke(processed_args)
+            if tool_name in DB_BOUND_TOOLS:
+                with self._db_lock:
+                    result = tool_to_run.invoke(processed_args)
+            else:
+                result = tool_to_run.invoke(processed_args)
             print(f"  - ✅ Result: {str(result)[:200]}...") # 결과가 너무 길 수 있으므로 일부만 출력
             print("-" * 70)
             return {"output": result}
@@ -61,4 +102,48 @@ class StepExecutor:
             error_msg = f"Error executing tool '{tool_name}': {e}"
             print(f"  - ❌ RESULT: {error_msg}")
             print("-" * 70)
-            return {"output": error_msg}
\ No newline at end of file
+            return {"output": error_msg}
+
+    def execute_plan(self, steps: list[dict], max_concurrency: int | None = None,
+                     on_event=None) -> tuple[dict, list[dict]]:
+        """
+        스텝 간 의존 그래프(DAG)를 만들어, 서로 독립인 스텝은 동시에 실행한다.
+        on_event(name, data) 가 주어지면 step_started / step_finished 를 알린다 (워커 스레드에서 호출될 수 있음).
+        반환: (step_outputs {"step_N_output": ...}, 계획 순서대로 정렬된 logs)
+        """
+        deps = step_dependencies(steps)
+        limit = max(1, max_concurrency or PLAN_MAX_CONCURRENCY)
+
+        step_outputs: dict[str, str] = {}
+        results: dict[int, dict] = {}
+        pending = set(range(len(steps)))
+
+        def run(idx: int) -> dict:
+            # 의존 스텝의 결과만 보이도록 (실행 타이밍에 따라 치환 결과가 달라지지 않게)
+            visible = {f"step_{d + 1}_output": step_outputs[f"step_{d + 1}_output"] for d in deps[idx]}
+            if on_event:
+                on_event("step_started", {"index": idx + 1, "tool": steps[idx].get("tool")})
+            return self.execute_step(steps[idx], visible)
+
+        with ThreadPoolExecutor(max_workers=limit, thread_name_prefix="plan-step") as pool:
+            running = {}
+            while pending or running:
+                ready = sorted(i for i in pending if deps[i] <= results.keys())
+                for idx in ready[: limit - len(running)]:
+                    pending.discard(idx)
+                    running[pool.submit(run, idx)] = idx
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    idx = running.pop(fut)
+                    results[idx] = fut.result()
+                    step_outputs[f"step_{idx + 1}_output"] = results[idx].get("output", "")
+                    if on_event:
+                        on_event("step_finished", {
+                            "index": idx + 1,
+                            "tool": steps[idx].get("tool"),
+                            "output": str(results[idx].get("output", ""))[:300],
+                        })
+
+        logs = [results[i] for i in range(len(steps))]
+        return step_outputs, logs
@@ -1,28 +1,58 @@
 # backend/agent/mcp_loader.py
-import socket, json
+import socket, json, time, random, asyncio, itertools, threading, functools
+from concurrent.futures import Future, TimeoutError as FutureTimeout
 from typing import Any, Dict, List, Optional, Type
 from pydantic import BaseModel, create_model
 from langchain_core.tools import BaseTool
 
 DELIM = b"\n\n"
 
-class MCPClient:
-    def __init__(self, host="mcp-weather", port=7001, timeout=3.0):
-        self.host = host
-        self.port = port
-        self.timeout = timeout
 
-    def _rpc(self, method: str, params: Optional[dict] = None) -> dict:
-        req = {"jsonrpc": "2.0", "id": method, "method": method}
-        if params:
-            req["params"] = params
-        data = (json.dumps(req, ensure_ascii=False) + "\n\n").encode()
-        with socket.create_connection((self.host, self.port), timeout=self.timeout) as s:
-            s.sendall(data)
-            buf = b""
-            s.settimeout(self.timeout)
+class _MCPConnection:
+    """
+    MCP 서버와의 장기 연결 1개.
+    - 요청마다 고유 id 를 붙여 보내고, 리더 스레드가 응답 id 로 대기 중인 Future 를 깨운다
+    - 그래서 한 연결 위에 여러 요청을 동시에(in-flight) 실을 수 있다
+    """
+    def __init__(self, host: str, port: int, timeout: float, on_close):
+        self.sock = socket.create_connection((host, port), timeout=timeout)
+        self.sock.settimeout(None)          # 리더는 블로킹 recv, 요청 타임아웃은 Future 쪽에서
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.alive = True
+        self._pending: Dict[int, Future] = {}
+        self._lock = threading.Lock()       # _pending + sendall 보호
+        self._on_close = on_close
+        self._reader = threading.Thread(target=self._read_loop, name="mcp-reader", daemon=True)
+        self._reader.start()
+
+    @property
+    def inflight(self) -> int:
+        return len(self._pending)
+
+    def send(self, req_id: int, payload: bytes) -> Future:
+        fut: Future = Future()
+        with self._lock:
+            if not self.alive:
+                raise ConnectionError("MCP connection closed")
+            self._pending[req_id] = fut
+            try:
+                self.sock.sendall(payload)
+            except OSError as e:
+                self._pending.pop(req_id, None)
+                self._fail(e)
+                raise ConnectionError(f"MCP send failed: {e}") from e
+        return fut
+
+    def forget(self, req_id: int):
+        with self._lock:
+            self._pending.pop(req_id, None)
+
+    def _read_loop(self):
+        buf = b""
+        err: Exception = ConnectionError("MCP connection closed by server")
+        try:
             while True:
-                chunk = s.recv(65536)
+                chunk = self.sock.recv(65536)
                 if not chunk:
                     break
                 buf += chunk
@@ -30,10 +60,203 @@ class MCPClient:
                     raw, buf = buf.split(DELIM, 1)
                     if not raw.strip():
                         continue
-                    msg = json.loads(raw.decode())
-                    if msg.get("id") == method:
-                        return msg
-        raise RuntimeError(f"MCP rpc timeout: {method}")
+                    try:
+                        msg = json.loads(raw.decode())
+                    except ValueError:
+                        print(f"[MCP] malformed frame dropped: {raw[:80]!r}")
+                        continue
+                    with self._lock:
+                        fut = self._pending.pop(msg.get("id"), None)
+                    if fut is not None and not fut.done():
+                        fut.set_result(msg)
+        except OSError as e:
+            err = e
+        with self._lock:
+            self._fail(err)
+
+    def _fail(self, err: Exception):
+        # _lock 을 잡은 상태에서 호출
+        if not self.alive:
+            return
+        self.alive = False
+        for fut in self._pending.values():
+            if not fut.done():
+                fut.set_exception(ConnectionError(f"MCP connection lost: {err}"))
+        self._pending.clear()
+        try:
+            self.sock.close()
+        except OSError:
+            pass
+        self._on_close(self)
+
+    def close(self):
+        with self._lock:
+            self._fail(ConnectionError("closed by client"))
+
+
+class _NeedConnect(Exception):
+    """비동기 경로에서 새 연결이 필요함 (connect 는 스레드에서)"""
+
+
+class MCPClient:
+    """
+    MCP 서버용 연결 풀 클라이언트.
+    - 최대 pool_size 개의 장기 연결을 유지하고, in-flight 요청이 가장 적은 연결을 고른다
+    - 연결 실패 시 지수 백오프(+jitter) 동안은 새 연결 시도 없이 바로 실패
+    - metrics() 로 풀 상태/카운터 확인
+    """
+    def __init__(self, host="mcp-weather", port=7001, timeout=3.0,
+                 pool_size: int = 2, max_inflight: int = 128, max_backoff: float = 30.0):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.pool_size = pool_size
+        self.max_inflight = max_inflight
+        self.max_backoff = max_backoff
+
+        self._ids = itertools.count(1)
+        self._conns: List[_MCPConnection] = []
+        self._connecting = 0                # 락 밖에서 연결 중인 수 (pool_size 에 포함)
+        self._lock = threading.Lock()       # _conns / _connecting / 백오프 상태 보호 (네트워크 I/O 는 락 밖에서)
+        self._connected = threading.Condition(self._lock)   # 진행 중인 연결이 끝나면 notify
+        self._failures = 0
+        self._retry_at = 0.0
+        self._stats_lock = threading.Lock()
+        self._stats = {"connects": 0, "connect_errors": 0, "disconnects": 0,
+                       "requests": 0, "errors": 0, "timeouts": 0}
+
+    def _count(self, key: str):
+        with self._stats_lock:
+            self._stats[key] += 1
+
+    # ── 풀 관리 ────────────────────────────────────────
+    def _on_close(self, conn: _MCPConnection):
+        with self._lock:
+            if conn in self._conns:
+                self._conns.remove(conn)
+                removed = True
+            else:
+                removed = False
+        if removed:
+            self._count("disconnects")
+
+    def _connect(self) -> _MCPConnection:
+        """새 연결 (락 없이 호출 — 호출 전에 _connecting 자리를 잡아 둔 상태)"""
+        try:
+            conn = _MCPConnection(self.host, self.port, self.timeout, self._on_close)
+        except OSError as e:
+            with self._lock:
+                self._connecting -= 1
+                self._failures += 1
+                delay = min(self.max_backoff, 0.5 * 2 ** (self._failures - 1))
+                self._retry_at = time.monotonic() + delay * (0.5 + random.random() / 2)
+                self._connected.notify_all()
+            self._count("connect_errors")
+            raise ConnectionError(f"MCP connect failed: {e}") from e
+        with self._lock:
+            self._connecting -= 1
+            self._failures = 0
+            self._retry_at = 0.0
+            self._conns.append(conn)
+            self._connected.notify_all()
+        self._count("connects")
+        return conn
+
+    def _acquire(self, allow_connect: bool = True) -> _MCPConnection:
+        """
+        in-flight 가 가장 적은 연결 선택. 새 연결이 필요하면 락 밖에서 연결한다
+        allow_connect=False 면 연결이 필요할 때 _NeedConnect (이벤트 루프에서 블로킹 connect 방지)
+        """
+        with self._lock:
+            deadline = time.monotonic() + self.timeout
+            while True:
+                alive = [c for c in self._conns if c.alive]
+                best = min(alive, key=lambda c: c.inflight, default=None)
+                # 쓸 연결이 없고 풀 자리가 모두 연결 중이면 그 결과를 기다림
+                if best is None and self._connecting and len(alive) + self._connecting >= self.pool_size:
+                    if not allow_connect:
+                        raise _NeedConnect()
+                    left = deadline - time.monotonic()
+                    if left <= 0:
+                        raise ConnectionError("MCP connect wait timed out")
+                    self._connected.wait(left)
+                    continue
+                break
+            # 놀고 있는 연결이 없고 풀에 여유가 있으면 새 연결
+            want_new = best is None or (best.inflight > 0 and len(alive) + self._connecting < self.pool_size)
+            if want_new:
+                now = time.monotonic()
+                if now < self._retry_at:
+                    if best is None:
+                        raise ConnectionError(f"MCP backoff ({self._retry_at - now:.1f}s left)")
+                    want_new = False
+                elif not allow_connect:
+                    if best is None:
+                        raise _NeedConnect()
+                    want_new = False
+                else:
+                    self._connecting += 1       # 자리 확보 → 락 밖에서 연결
+            if not want_new:
+                if best.inflight >= self.max_inflight:
+                    raise ConnectionError("MCP pool exhausted (too many in-flight requests)")
+                return best
+        try:
+            return self._connect()
+        except ConnectionError:
+            if best is None or not best.alive or best.inflight >= self.max_inflight:
+                raise
+            return best
+
+    def _send(self, method: str, params: Optional[dict],
+              allow_connect: bool = True, counted: bool = False) -> tuple[_MCPConnection, int, Future]:
+        req_id = next(self._ids)
+        req = {"jsonrpc": "2.0", "id": req_id, "method": method}
+        if params:
+            req["params"] = params
+        data = (json.dumps(req, ensure_ascii=False) + "\n\n").encode()
+        if not counted:
+            self._count("requests")
+        # 끊긴 연결에 보내다 실패한 경우(요청이 서버에 닿지 않음)만 새 연결로 1회 재시도
+        for attempt in range(2):
+            try:
+                conn = self._acquire(allow_connect)
+                return conn, req_id, conn.send(req_id, data)
+            except ConnectionError:
+                if attempt:
+                    self._count("errors")
+                    raise
+        raise AssertionError("unreachable")
+
+    # ── RPC ────────────────────────────────────────────
+    def _rpc(self, method: str, params: Optional[dict] = None) -> dict:
+        conn, req_id, fut = self._send(method, params)
+        try:
+            return fut.result(timeout=self.timeout)
+        except FutureTimeout:
+            conn.forget(req_id)
+            self._count("timeouts")
+            raise RuntimeError(f"MCP rpc timeout: {method}")
+        except ConnectionError:
+            self._count("errors")
+            raise
+
+    async def _arpc(self, method: str, params: Optional[dict] = None) -> dict:
+        # 열린 연결이 있으면 바로 전송, 새 연결이 필요하면 블로킹 connect 를 스레드로 넘김
+        try:
+            conn, req_id, fut = self._send(method, params, allow_connect=False)
+        except _NeedConnect:
+            loop = asyncio.get_running_loop()
+            conn, req_id, fut = await loop.run_in_executor(
+                None, functools.partial(self._send, method, params, counted=True))
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(fut), self.timeout)
+        except asyncio.TimeoutError:
+            conn.forget(req_id)
+            self._count("timeouts")
+            raise RuntimeError(f"MCP rpc timeout: {method}")
+        except ConnectionError:
+            self._count("errors")
+            raise
 
     def handshake(self) -> dict:
         return self._rpc("handshake")
@@ -47,20 +270,41 @@ class MCPClient:
         # 서버 응답 구조: {"result":{"result":{...}}}
         return resp.get("result", {}).get("result")
 
-def load_mcp_tools(host="mcp-weather", port=7001, timeout=3.0, prefix: str = "") -> List[BaseTool]:
-    """MCP 서버에서 tool schema 읽어 LangChain BaseTool 로 변환."""
-    out: List[BaseTool] = []
-    try:
-        client = MCPClient(host, port, timeout)
-        hs = client.handshake()
-        # 프로토콜 확인 (선택)
-        if hs.get("result", {}).get("protocol") != "mcp/1":
-            print(f"[MCP] unexpected protocol: {hs}")
-        specs = client.list_tools()
-    except Exception as e:
-        print(f"[MCP] connect failed: {e}")
-        return out
+    async def acall_tool(self, name: str, args: dict) -> Any:
+        resp = await self._arpc("call_tool", {"name": name, "args": args})
+        return resp.get("result", {}).get("result")
 
+    def metrics(self) -> dict:
+        with self._stats_lock:
+            stats = dict(self._stats)
+        with self._lock:
+            alive = [c for c in self._conns if c.alive]
+            return {
+                **stats,
+                "connecting": self._connecting,
+                "pool_size": self.pool_size,
+                "open_connections": len(alive),
+                "inflight": sum(c.inflight for c in alive),
+                "backoff_remaining": max(0.0, self._retry_at - time.monotonic()),
+            }
+
+    def close(self):
+        with self._lock:
+            conns, self._conns = list(self._conns), []
+        for c in conns:
+            c.close()
+
+def fetch_mcp_specs(client: MCPClient) -> List[dict]:
+    """handshake + list_tools → tool spec 목록 (실패 시 예외)"""
+    hs = client.handshake()
+    # 프로토콜 확인 (선택)
+    if hs.get("result", {}).get("protocol") != "mcp/1":
+        print(f"[MCP] unexpected protocol: {hs}")
+    return client.list_tools()
+
+def build_mcp_tools(specs: List[dict], client: MCPClient, prefix: str = "") -> List[BaseTool]:
+    """tool spec 목록 → LangChain BaseTool 인스턴스 (네트워크 호출 없음)"""
+    out: List[BaseTool] = []
     for spec in specs:
         try:
             tool_name = prefix + spec["name"]  # prefix 필요없으면 제거
@@ -79,12 +323,12 @@ def load_mcp_tools(host="mcp-weather", port=7001, timeout=3.0, prefix: str = "")
                 f"MCPArgs_{tool_name}", **fields  # type: ignore
             )
 
-            # 런타임 함수 (클로저로 tool_name, client 캡처)
-            def _run(self, **kwargs):
-                return client.call_tool(spec["name"], kwargs)
+            # 런타임 함수 (기본 인자로 spec 이름 고정 — 루프 변수 late-binding 방지)
+            def _run(self, _name=spec["name"], **kwargs):
+                return client.call_tool(_name, kwargs)
 
-            async def _arun(self, **kwargs):
-                return _run(self, **kwargs)
+            async def _arun(self, _name=spec["name"], **kwargs):
+                return await client.acall_tool(_name, kwargs)
 
             # type() 로 동적 클래스 생성 (스코프 문제 회피)
             ToolCls = type(
@@ -107,3 +351,13 @@ def load_mcp_tools(host="mcp-weather", port=7001, timeout=3.0, prefix: str = "")
         names = ", ".join(t.name for t in out)
         print(f"[MCP] Loaded tools: {names}")
     return out
+
+def load_mcp_tools(host="mcp-weather", port=7001, timeout=3.0, prefix: str = "") -> List[BaseTool]:
+    """MCP 서버에서 tool schema 읽어 LangChain BaseTool 로 변환."""
+    try:
+        client = MCPClient(host, port, timeout)
+        specs = fetch_mcp_specs(client)
+    except Exception as e:
+        print(f"[MCP] connect failed: {e}")
+        return []
+    return build_mcp_tools(specs, client, prefix)
@@ -0,0 +1,90 @@
+# backend/agent/registry.py
+
+import os, json, time, hashlib, threading
+from typing import List
+from langchain_core.tools import BaseTool
+
+from .mcp_loader import MCPClient, fetch_mcp_specs, build_mcp_tools
+
+MCP_HOST = os.getenv("MCP_HOST", "mcp-weather")
+MCP_PORT = int(os.getenv("MCP_PORT", "7001"))
+MCP_TOOLS_TTL = float(os.getenv("MCP_TOOLS_TTL", "300"))   # 초 단위 재조회 주기
+
+
+class ToolRegistry:
+    """
+    프로세스 전역 MCP 도구 레지스트리.
+    - 앱 시작 시 한 번 tool spec 을 읽어 BaseTool 로 만들어 두고
+    - 백그라운드 스레드가 TTL 마다 spec 을 다시 읽어, 내용(버전 해시)이 바뀐 경우에만 교체
+    - 요청 경로(make_toolset)는 캐시된 도구 목록만 읽으므로 네트워크 왕복이 없다
+    """
+    def __init__(self, host: str = MCP_HOST, port: int = MCP_PORT, ttl: float = MCP_TOOLS_TTL):
+        self.client = MCPClient(host, port)
+        self.ttl = ttl
+        self.version: str | None = None
+        self.loaded_at: float | None = None
+        self._tools: List[BaseTool] = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    # ── 조회 ───────────────────────────────────────────
+    def mcp_tools(self) -> List[BaseTool]:
+        """캐시된 MCP 도구 목록. 아직 한 번도 로드되지 않았다면 동기로 1회 로드."""
+        if self.loaded_at is None:
+            self.refresh(force=False)
+        return list(self._tools)
+
+    def status(self) -> dict:
+        return {
+            "version": self.version,
+            "loaded_at": self.loaded_at,
+            "tools": [t.name for t in self._tools],
+            "pool": self.client.metrics(),
+        }
+
+    # ── 갱신 ───────────────────────────────────────────
+    def refresh(self, force: bool = True) -> bool:
+        """spec 을 다시 읽어 버전이 바뀌었으면 도구를 재생성. 실패 시 기존 도구 유지."""
+        with self._lock:
+            if not force and self.loaded_at is not None:
+                return False   # 다른 스레드가 먼저 로드함
+            try:
+                specs = fetch_mcp_specs(self.client)
+            except Exception as e:
+                print(f"[MCP] registry refresh failed: {e}")
+                if self.loaded_at is None:
+                    self.loaded_at = time.time()   # 요청마다 재시도하지 않도록 (백그라운드가 재시도)
+                return False
+
+            version = hashlib.sha1(
+                json.dumps(specs, sort_keys=True, ensure_ascii=False).encode()
+            ).hexdigest()[:12]
+            self.loaded_at = time.time()
+            if version == self.version:
+                return False
+
+            self._tools = build_mcp_tools(specs, self.client)
+            print(f"[MCP] registry version {self.version} → {version}")
+            self.version = version
+            return True
+
+    def _loop(self):
+        self.refresh()
+        # 아직 한 번도 성공하지 못했다면 TTL 보다 짧게 재시도
+        while not self._stop.wait(self.ttl if self.version else min(self.ttl, 15.0)):
+            self.refresh()
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="mcp-registry", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self.client.close()
+
+
+tool_registry = ToolRegistry()
@@ -14,7 +14,8 @@ import models
 from routers.gcal import build_gcal_service
 from routers.search import google_search_cse
 from utils.image import fetch_and_resize
-from .mcp_loader import load_mcp_tools
+from utils.blob_store import blob_store
+from .registry import tool_registry
 
 # Pydantic 스키마 (기존 __init__.py에서 이동)
 class CreateEventArgs(BaseModel):
@@ -108,7 +109,7 @@ def make_toolset(db: Session, user: models.User, tz: ZoneInfo, openai_client, ll
 
     @tool(args_schema=GenImgArgs, return_direct=True)
     def generate_image(prompt: str) -> str:
-        """DALL-E 3 로 이미지를 생성해 base64 JSON 을 돌려준다."""
+        """DALL-E 3 로 이미지를 생성해 blob 저장소에 넣고, blob key JSON 을 돌려준다."""
         try:
             resp = openai_client.images.generate(
                 model="dall-e-3", prompt=prompt, n=1, size="1024x1024"
@@ -117,8 +118,8 @@ def make_toolset(db: Session, user: models.User, tz: ZoneInfo, openai_client, ll
             orig, thumb = fetch_and_resize(url)
             payload = {
                 "prompt": prompt,
-                "original_b64": orig,
-                "thumb_b64": thumb,
+                "original_key": blob_store.put(orig),
+                "thumb_key": blob_store.put(thumb),
             }
             return json.dumps(payload, ensure_ascii=False)   # ★ 반드시 str!
         except Exception as e:
@@ -183,7 +184,6 @@ def make_toolset(db: Session, user: models.User, tz: ZoneInfo, openai_client, ll
         extract_best_title,
     ]
 
-    # MCP 로드 (실패해도 base_tools 그대로)
-    mcp_tools = load_mcp_tools(host=os.getenv("MCP_HOST","mcp-weather"),
-                               port=int(os.getenv("MCP_PORT","7001")))
-    return base_tools + mcp_tools
\ No newline at end of file
+    # MCP 도구는 프로세스 전역 레지스트리에서 재사용 (요청마다 handshake/list_tools 하지 않음)
+    # 실패해도 base_tools 그대로
+    return base_tools + tool_registry.mcp_tools()
\ No newline at end of file
@@ -5,5 +5,14 @@ from sqlalchemy.orm import sessionmaker
 
 DATABASE_URL = os.environ.get("DATABASE_URL")  # or a default
 
-engine = create_engine(DATABASE_URL, echo=False)
+# 커넥션 풀 크기 (SQLAlchemy 기본값과 같음) — 동시 DB 작업 스레드 수의 상한 계산에도 사용
+DB_POOL_SIZE    = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_MAX_CONNECTIONS = DB_POOL_SIZE + DB_MAX_OVERFLOW
+
+# sqlite(테스트/로컬)는 QueuePool 이 아니라 풀 크기 인자를 받지 않음
+_pool_args = {} if (DATABASE_URL or "").startswith("sqlite") else dict(
+    pool_size=DB_POOL_SIZE, max_overflow=DB_MAX_OVERFLOW,
+)
+engine = create_engine(DATABASE_URL, echo=False, **_pool_args)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
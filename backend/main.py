@@ -9,6 +9,8 @@ from routers import recommend
 from routers import feedback
 from routers import profile, speech
 from database import engine
+from agent.registry import tool_registry
+from utils.pdf_extract import shutdown_pdf_pool
 import models
 
 # 데이터베이스 테이블 생성(동기 모드라면)
@@ -29,6 +31,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],            # 허용할 http 메서드
     allow_headers=["*"],            # 허용할 http 헤더
+    expose_headers=["X-Next-Cursor"],  # 대화 목록 페이지네이션 커서
 )
 
 # 라우터 등록
@@ -44,6 +47,23 @@ app.include_router(feedback.router)
 app.include_router(profile.router)   # /profile
 app.include_router(speech.router)
 
+@app.on_event("startup")
+def _start_background_workers():
+    # MCP tool spec 을 미리 읽고, 이후 TTL 마다 백그라운드 갱신
+    tool_registry.start()
+    # 대화 제목 요약 워커 + 재시작 전 처리 못한 제목 작업 복구
+    chat.title_queue.start()
+    try:
+        chat.enqueue_untitled_conversations()
+    except Exception as e:
+        print(f"[title] startup sweep failed: {e}")
+
+@app.on_event("shutdown")
+def _stop_background_workers():
+    tool_registry.stop()
+    chat.title_queue.stop()
+    shutdown_pdf_pool()
+
 @app.get("/")
 def read_root():
     return {"message": "Hello from FastAPI!"}
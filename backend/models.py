@@ -1,7 +1,7 @@
 # backend/models.py
 
 from sqlalchemy import Column, Integer, Float, String, ForeignKey, DateTime, Text, ARRAY, JSON
-from sqlalchemy import Boolean
+from sqlalchemy import Boolean, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.sql import func
@@ -27,6 +27,11 @@ class Conversation(Base):
     title = Column(String, nullable=True)
     created_at = Column(DateTime, server_default=func.now())
 
+    # 목록 키셋 페이지네이션 (user_id, created_at, id)
+    __table_args__ = (
+        Index("ix_conversations_user_created", "user_id", "created_at", "id"),
+    )
+
     # User와의 관계
     owner = relationship("User", back_populates="conversations")
     # Message와의 관계
@@ -42,6 +47,11 @@ class Message(Base):
     content = Column(Text)
     created_at = Column(DateTime, server_default=func.now())
 
+    # 대화별 메시지 키셋 페이지네이션 (conversation_id, created_at, id)
+    __table_args__ = (
+        Index("ix_messages_convo_created", "conversation_id", "created_at", "id"),
+    )
+
     conversation = relationship("Conversation", back_populates="messages")
     recommendations = relationship(
         "MessageRecommendationMap",
@@ -94,7 +104,8 @@ class RecCard(Base):
     url = Column(String)
     reason = Column(Text, nullable=True)    # LLM이나 규칙 기반으로 생성된 추천 사유
     tags = Column(ARRAY(String), default=[])# 검색 및 필터용 태그
-    created_at = Column(DateTime, server_default=func.now())
+    created_at = Column(DateTime, server_default=func.now())   # 처음 생성 시각 (고정 — 최신성 특징에 사용)
+    refreshed_at = Column(DateTime, server_default=func.now(), index=True)  # 소스에서 마지막으로 다시 받은 시각 (후보 정렬용)
 
 class RecImpression(Base):
     __tablename__ = "rec_impressions"
@@ -184,8 +195,12 @@ class MessageImage(Base):
     id          = Column(Integer, primary_key=True)
     message_id  = Column(Integer, ForeignKey("messages.id"), nullable=False)
     prompt      = Column(Text, nullable=False)
-    original_b64 = Column(Text, nullable=False)   # 512×512(원본)
-    thumb_b64    = Column(Text, nullable=False)   # 128×128(썸네일)
+    # WebP 바이트는 blob 저장소(utils.blob_store)에, 여기엔 SHA-256 key 만 저장
+    original_key = Column(String(64), nullable=True)   # 512×512(원본)
+    thumb_key    = Column(String(64), nullable=True)   # 128×128(썸네일)
+    # (레거시) 예전 행의 base64 본문 — 새 행은 NULL
+    original_b64 = Column(Text, nullable=True)
+    thumb_b64    = Column(Text, nullable=True)
 
 # 양방향 관계
 Message.images = relationship(
@@ -1,25 +1,47 @@
 # backend/routers/chat.py
 
-import os, json
+import os, json, asyncio
+from concurrent.futures import ThreadPoolExecutor
 import datetime as dt
 from zoneinfo import ZoneInfo 
 from openai import OpenAI
 import httpx
 from typing import Literal
 from pydantic import BaseModel, constr
-from fastapi import APIRouter, HTTPException, Depends, Query
-from sqlalchemy.orm import Session
-from database import SessionLocal
+from fastapi import APIRouter, HTTPException, Depends, Query, Request
+from sqlalchemy import tuple_
+from sqlalchemy.orm import Session, selectinload
+from database import SessionLocal, DB_MAX_CONNECTIONS
 import models
 from models import Message, MessageRecommendationMap, RecCard
 from .auth import get_current_user_token  # JWT 인증 함수
 from .gcal  import build_gcal_service                  # Google service 헬퍼
 from utils.personalization import recent_feedback_summaries, make_persona_prompt
-from fastapi.responses import Response
+from fastapi.responses import Response, StreamingResponse, FileResponse
+from langchain_core.callbacks import BaseCallbackHandler
 import base64
 from agent import build_agent, run_lcel_once
+from utils.jobs import BackgroundJobQueue
+from utils.pagination import encode_cursor, decode_cursor
+from utils.blob_store import blob_store
+from utils.rec_cards import upsert_rec_cards
 
 HISTORY_CUTOFF = 12
+TITLE_PREFIX_MESSAGES = 6      # 제목 요약에 쓰는 앞부분 메시지 수
+TITLE_PREFIX_CHARS    = 2000   # 프롬프트로 보내는 최대 글자 수
+UNTITLED = "Untitled chat"
+
+# async 엔드포인트에서 동기 /chat 파이프라인을 돌리는 전용 스레드 풀 (동시 실행 상한)
+# 워커마다 파이프라인 내내 DB 세션(커넥션 1개)을 잡으므로 커넥션 풀 크기에 맞춤
+#   상한 = DB_MAX_CONNECTIONS - CHAT_DB_HEADROOM (요청 의존성 세션·제목 작업·추천 소스 갱신 몫)
+# CHAT_WORKERS 를 상한보다 크게 주면 상한으로 줄임 (풀 대기 → QueuePool timeout 방지)
+CHAT_DB_HEADROOM = int(os.getenv("CHAT_DB_HEADROOM", "5"))
+_CHAT_WORKERS_MAX = max(DB_MAX_CONNECTIONS - CHAT_DB_HEADROOM, 1)
+CHAT_WORKERS = int(os.getenv("CHAT_WORKERS", str(_CHAT_WORKERS_MAX)))
+if CHAT_WORKERS > _CHAT_WORKERS_MAX:
+    print(f"[chat] CHAT_WORKERS={CHAT_WORKERS} > DB 커넥션 여유 {_CHAT_WORKERS_MAX} → {_CHAT_WORKERS_MAX} 로 제한")
+    CHAT_WORKERS = _CHAT_WORKERS_MAX
+_chat_executor = ThreadPoolExecutor(max_workers=CHAT_WORKERS, thread_name_prefix="chat")
 
 # 1) 로컬 타임존 결정
 try:
@@ -75,31 +97,36 @@ def append_and_commit(db, convo, role, content):
     db.refresh(msg)
     return msg
 
-@router.post("/", status_code=201)
-def chat(req: ChatRequest,
-         db: Session = Depends(get_db),
-         me: models.User = Depends(get_current_user_token)):
-
-    # 0) 대화 객체
+def _get_or_create_convo(db: Session, me: models.User, conversation_id: int | None) -> models.Conversation:
     convo = (db.query(models.Conversation)
-               .filter_by(id=req.conversation_id, user_id=me.id).first()
-             if req.conversation_id else None)
+               .filter_by(id=conversation_id, user_id=me.id).first()
+             if conversation_id else None)
     if not convo:
-        convo = models.Conversation(user_id=me.id, title="Untitled chat")
+        convo = models.Conversation(user_id=me.id, title=UNTITLED)
         db.add(convo); db.commit(); db.refresh(convo)
+    return convo
 
-    # 1) user 메시지 저장
-    append_and_commit(db, convo, "user", req.question)
+class _TokenStreamHandler(BaseCallbackHandler):
+    """에이전트 LLM 이 생성하는 토큰을 그대로 on_event("token", …) 으로 전달 (/chat/stream 용)"""
+    def __init__(self, on_event):
+        self.on_event = on_event
 
-    # 2) Agent 실행
+    def on_llm_new_token(self, token: str, **kwargs):
+        if token:       # tool call 청크는 content 가 비어 있음
+            self.on_event("token", {"delta": token})
+
+def _run_agent(db: Session, me: models.User, convo: models.Conversation,
+               req: ChatRequest, on_event=None) -> dict:
     tz  = ZoneInfo(req.timezone) if req.timezone else local_tz
     if req.plan_mode:
-        res = run_lcel_once(db, me, tz, user_input=req.question)
-    else:
-        # 기존 단일-스텝 에이전트
-        res = build_agent(db, me, tz, convo.messages).invoke({"input": req.question})
-
-    # 3) 결과 해석 ────────────────◆ 여기부터 수정 ◆───────────────
+        return run_lcel_once(db, me, tz, user_input=req.question, on_event=on_event)
+    # 기존 단일-스텝 에이전트 (on_event 가 있으면 LLM 토큰을 실시간으로 흘려보냄)
+    config = {"callbacks": [_TokenStreamHandler(on_event)]} if on_event else None
+    return (build_agent(db, me, tz, convo.messages, streaming=on_event is not None)
+            .invoke({"input": req.question}, config=config))
+
+def _persist_result(db: Session, convo: models.Conversation, res: dict) -> tuple[str, list]:
+    """에이전트 결과 해석 → assistant 메시지(+이미지/추천카드) 저장. (answer, cards) 반환"""
     payload: dict | None = None   # 최종 카드/이미지 JSON
     answer, cards = "", []
     if isinstance(res["output"], str):
@@ -108,8 +135,8 @@ def chat(req: ChatRequest,
         except json.JSONDecodeError:
             answer = res["output"]    
 
-    # (1) 이미지
-    if payload and {"original_b64", "thumb_b64"} <= payload.keys():
+    # (1) 이미지 (바이트는 generate_image 가 이미 blob 저장소에 넣어둠)
+    if payload and {"original_key", "thumb_key"} <= payload.keys():
         assistant_msg = append_and_commit(
             db, convo, "assistant",
             f"📷 요청하신 이미지를 생성했습니다.\n\nprompt: {payload.get('prompt','')}"
@@ -117,8 +144,8 @@ def chat(req: ChatRequest,
         db.add(models.MessageImage(
             message_id   = assistant_msg.id,
             prompt       = payload.get("prompt",""),
-            original_b64 = payload["original_b64"],
-            thumb_b64    = payload["thumb_b64"],
+            original_key = payload["original_key"],
+            thumb_key    = payload["thumb_key"],
         ))
         db.commit()
         answer = "(image_created)"
@@ -137,25 +164,21 @@ def chat(req: ChatRequest,
         # ── 2) assistant 메시지 row ────────────────────────────
         assistant_msg = append_and_commit(db, convo, "assistant", answer)
 
-        # ── 3) RecCard 존재 → 없으면 INSERT, 그리고 매핑 INSERT ─
-        for idx, c in enumerate(cards):
-            card_row = db.query(RecCard).filter_by(id=c["card_id"]).first()
-            if not card_row:
-                card_row = RecCard(
-                    id       = c["card_id"],
-                    type     = c.get("type", "content"),
-                    title    = c.get("title", "Untitled"),
-                    subtitle = c.get("subtitle", ""),
-                    url      = c.get("link", ""),
-                    reason   = c.get("reason", ""),
-                    tags     = c.get("tags", []),
-                )
-                db.add(card_row)
-                db.flush()                      # id 보장
+        # ── 3) RecCard 없으면 INSERT (ON CONFLICT DO NOTHING 1회), 그리고 매핑 INSERT ─
+        upsert_rec_cards(db, [dict(
+            id       = c["card_id"],
+            type     = c.get("type", "content"),
+            title    = c.get("title", "Untitled"),
+            subtitle = c.get("subtitle", ""),
+            url      = c.get("link", ""),
+            reason   = c.get("reason", ""),
+            tags     = c.get("tags", []),
+        ) for c in cards], update=False)
 
+        for idx, c in enumerate(cards):
             db.add(MessageRecommendationMap(
                 message_id  = assistant_msg.id,
-                rec_card_id = card_row.id,
+                rec_card_id = c["card_id"],
                 sort_order  = idx,
             ))
 
@@ -164,23 +187,152 @@ def chat(req: ChatRequest,
     else:                                                                            # 일반 텍스트
         append_and_commit(db, convo, "assistant", answer)
 
-    # 4) Untitled 일 때 제목 요약
-    if convo.title == "Untitled chat":
-        summarize_conversation_title(db, convo)
+    return answer, cards
+
+def _chat_pipeline(db: Session, me: models.User, req: ChatRequest, on_event=None) -> dict:
+    """/chat 공통 파이프라인 : 대화 → user 메시지 → Agent → 결과 저장 → 제목 작업 등록"""
+    # 0) 대화 객체
+    convo = _get_or_create_convo(db, me, req.conversation_id)
+    if on_event:
+        on_event("conversation", {"conversation_id": convo.id})
+
+    # 1) user 메시지 저장
+    append_and_commit(db, convo, "user", req.question)
+
+    # 2) Agent 실행
+    res = _run_agent(db, me, convo, req, on_event=on_event)
+
+    # 3) 결과 해석 + 저장
+    answer, cards = _persist_result(db, convo, res)
+
+    # 4) Untitled 일 때 제목 요약 → 백그라운드 작업 (응답을 기다리게 하지 않음)
+    if convo.title == UNTITLED:
+        title_queue.submit(convo.id)
 
     return {"conversation_id": convo.id, "answer": answer, "cards": cards}
 
+def run_chat(req: ChatRequest, user_id: int, on_event=None) -> dict:
+    """요청 의존성과 분리된 전용 세션으로 /chat 파이프라인 실행 (워커 스레드용)"""
+    db = SessionLocal()
+    try:
+        me = db.query(models.User).filter_by(id=user_id).first()
+        if not me:
+            raise HTTPException(404, "User not found")
+        return _chat_pipeline(db, me, req, on_event=on_event)
+    finally:
+        db.close()
+
+async def run_chat_async(req: ChatRequest, user_id: int, on_event=None) -> dict:
+    """
+    async 엔드포인트(/chat/stream, /speech/chat)용 — 동기 파이프라인(플래너·툴·DB·LLM)을
+    이벤트 루프가 아닌 _chat_executor 에서 실행. 워커 수로 동시 실행 상한을 둔다.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_chat_executor, run_chat, req, user_id, on_event)
+
+@router.post("/", status_code=201)
+def chat(req: ChatRequest,
+         db: Session = Depends(get_db),
+         me: models.User = Depends(get_current_user_token)):
+    # 동기 엔드포인트 → FastAPI 스레드풀에서 실행되므로 요청 세션으로 바로 처리
+    return _chat_pipeline(db, me, req)
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False, default=str)}\n\n"
+
+@router.post("/stream")
+async def chat_stream(req: ChatRequest,
+                      me: models.User = Depends(get_current_user_token)):
+    """
+    POST /chat/stream  (text/event-stream)
+    /chat 과 같은 파이프라인을 워커 스레드에서 돌리면서 진행 상황을 SSE 로 흘려보낸다.
+      conversation → plan → step_started / step_finished … → token … → cards → done
+    - plan_mode=false : 에이전트 LLM 이 만드는 토큰이 생성되는 대로 token 이벤트로 온다
+    - plan_mode=true, 또는 도구 결과를 그대로 돌려주는 경우(일정/이미지/추천) :
+      답변이 LLM 토큰이 아니라 도구 결과로 만들어지므로 완성된 답변이 token 한 번으로 온다
+    어느 경우든 done 의 answer 가 저장된 최종 답변이다.
+    """
+    user_id = me.id
+    loop    = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue()
+    streamed = False        # LLM 토큰을 한 번이라도 보냈는지
+
+    def emit(event: str | None, data: dict | None = None):
+        # 워커/스텝 스레드에서 호출 → 이벤트 루프 쪽 큐로 안전하게 전달
+        nonlocal streamed
+        if event == "token":
+            streamed = True
+        loop.call_soon_threadsafe(queue.put_nowait, (event, data))
+
+    async def work():
+        # 스트리밍 응답 동안 살아있어야 하므로 요청 의존성이 아닌 전용 세션 사용 (run_chat)
+        try:
+            result = await run_chat_async(req, user_id, on_event=emit)
+            if result["answer"] and not streamed:
+                emit("token", {"delta": result["answer"]})
+            if result["cards"]:
+                emit("cards", {"cards": result["cards"]})
+            emit("done", result)
+        except Exception as e:
+            detail = e.detail if isinstance(e, HTTPException) else str(e)
+            print(f"[chat/stream] error: {detail}")
+            emit("error", {"detail": detail})
+        finally:
+            emit(None)
+
+    task = asyncio.create_task(work())
+
+    async def event_source():
+        while True:
+            event, data = await queue.get()
+            if event is None:
+                break
+            yield _sse(event, data)
+        await task
+
+    return StreamingResponse(
+        event_source(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
 @router.get("/conversations")
 def get_conversations(
+    response: Response,
+    limit: int | None = Query(None, ge=1, le=200, description="페이지 크기 (없으면 전체)"),
+    cursor: str | None = Query(None, description="이전 응답의 X-Next-Cursor 값"),
+    order: Literal["asc", "desc"] = Query("asc", description="asc: 오래된 순(기존 동작), desc: 최신순"),
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_user_token)
 ):
     """
     - 현재 로그인 사용자(user_id) 소유의 conversation 목록 반환
+    - 기본은 기존과 같은 오래된 순, order=desc 면 최신순
+    - limit 을 주면 (created_at, id) 키셋 페이지네이션 (커서는 같은 order 로 이어서 사용)
+      → 다음 페이지 커서는 X-Next-Cursor 헤더로 내려줌 (마지막 페이지면 헤더 없음)
     """
-    convo_list = db.query(models.Conversation)\
-                   .filter_by(user_id=current_user.id)\
-                   .all()
+    key = tuple_(models.Conversation.created_at, models.Conversation.id)
+    q = db.query(models.Conversation).filter_by(user_id=current_user.id)
+    if order == "desc":
+        q = q.order_by(models.Conversation.created_at.desc(), models.Conversation.id.desc())
+    else:
+        q = q.order_by(models.Conversation.created_at, models.Conversation.id)
+    if cursor:
+        try:
+            ts, cid = decode_cursor(cursor)
+        except ValueError as e:
+            raise HTTPException(400, str(e))
+        q = q.filter(key < (ts, cid) if order == "desc" else key > (ts, cid))
+
+    if limit:
+        convo_list = q.limit(limit + 1).all()
+        if len(convo_list) > limit:
+            convo_list = convo_list[:limit]
+            last = convo_list[-1]
+            response.headers["X-Next-Cursor"] = encode_cursor(last.created_at, last.id)
+    else:
+        convo_list = q.all()
+
     results = []
     for c in convo_list:
         results.append({
@@ -190,14 +342,48 @@ def get_conversations(
         })
     return results
 
+def _feedback_info(fb: models.FeedbackLog | None) -> dict | None:
+    if not fb:
+        return None
+    return {
+        "feedback_id": fb.id,
+        "feedback_score": fb.feedback_score,
+        "feedback_label": fb.feedback_label,
+        "details": fb.details
+    }
+
+def _feedback_lookup(db: Session, user_id: int, keys: set[tuple[str, str]]) -> dict:
+    """
+    (category, reference_id) 집합 → {키: FeedbackLog} 를 한 번의 쿼리로 조회
+    같은 키가 여러 행이면 가장 먼저 만들어진(id 가 작은) 행을 사용
+    """
+    if not keys:
+        return {}
+    rows = (db.query(models.FeedbackLog)
+              .filter(models.FeedbackLog.user_id == user_id,
+                      models.FeedbackLog.category.in_({c for c, _ in keys}),
+                      models.FeedbackLog.reference_id.in_({r for _, r in keys}))
+              .order_by(models.FeedbackLog.id)
+              .all())
+    out: dict = {}
+    for fb in rows:
+        out.setdefault((fb.category, fb.reference_id), fb)
+    return out
+
 @router.get("/conversations/{conversation_id}")
 def get_conversation_detail(
     conversation_id: int,
+    limit: int | None = Query(None, ge=1, le=500, description="최근 N개 메시지만 (없으면 전체)"),
+    before: str | None = Query(None, description="이전 응답의 next_cursor → 그보다 오래된 메시지"),
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_user_token)
 ):
     """
-    - 특정 대화 상세(메시지 목록)를 불러온다
+    - 특정 대화 상세(메시지 목록)를 불러온다 (오래된 → 최신 순)
+    - limit 을 주면 최신 N개만, before 커서를 같이 주면 그 이전 N개 (키셋: created_at, id)
+      → 더 오래된 메시지가 남아있으면 next_cursor 에 커서, 아니면 null
+    - 메시지/추천카드/이미지는 eager loading, 피드백은 reference_id 로 한 번에 조회
+      → 대화 길이와 상관없이 쿼리 수가 일정 (대화 1 + 메시지 1 + 매핑 1 + 카드 1 + 이미지 1 + 피드백 1)
     """
     convo = db.query(models.Conversation).filter_by(
         id=conversation_id,
@@ -206,28 +392,48 @@ def get_conversation_detail(
     if not convo:
         raise HTTPException(status_code=404, detail="Conversation not found or not yours")
 
+    q = (db.query(Message)
+           .filter(Message.conversation_id == convo.id)
+           .options(
+               selectinload(Message.recommendations)
+                 .joinedload(MessageRecommendationMap.rec_card),
+               # 썸네일만 필요 → 원본 base64 는 읽지 않음
+               selectinload(Message.images)
+                 .defer(models.MessageImage.original_b64),
+           ))
+    if before:
+        try:
+            ts, mid = decode_cursor(before)
+        except ValueError as e:
+            raise HTTPException(400, str(e))
+        q = q.filter(tuple_(Message.created_at, Message.id) < (ts, mid))
+
+    next_cursor = None
+    if limit:
+        # 최신순으로 limit+1 개 → 남는 게 있으면 더 오래된 메시지가 있다는 뜻
+        msgs = q.order_by(Message.created_at.desc(), Message.id.desc()).limit(limit + 1).all()
+        if len(msgs) > limit:
+            msgs = msgs[:limit]
+            next_cursor = encode_cursor(msgs[-1].created_at, msgs[-1].id)
+        msgs.reverse()
+    else:
+        msgs = q.order_by(Message.created_at, Message.id).all()
+
+    # ----- 피드백 일괄 조회 (카드: card_id=…, 메시지: message_…)
+    fb_keys: set[tuple[str, str]] = set()
+    for m in msgs:
+        fb_keys.add(("chat", f"message_{m.id}"))
+        for mr in m.recommendations:
+            fb_keys.add(("recommend", f"card_id={mr.rec_card_id}"))
+    fb_map = _feedback_lookup(db, current_user.id, fb_keys)
+
     messages = []
-    for m in convo.messages:
+    for m in msgs:
         # ↘ 추천 카드가 있으면, 관계를 통해 가져옴
         card_list = []
         for mr in m.recommendations:
             c = mr.rec_card
             # DB의 RecCard 정보를 JSON 형태로 변환
-            card_fb = db.query(models.FeedbackLog).filter_by(
-                user_id = current_user.id,
-                category="recommend",
-                reference_id=f"card_id={c.id}"   # or just c.id
-            ).first()
-
-            card_feedback_info = None
-            if card_fb:
-                card_feedback_info = {
-                    "feedback_id": card_fb.id,
-                    "feedback_score": card_fb.feedback_score,
-                    "feedback_label": card_fb.feedback_label,
-                    "details": card_fb.details
-                }
-
             card_list.append({
                 "card_id"  : c.id,
                 "type"     : c.type,
@@ -235,30 +441,18 @@ def get_conversation_detail(
                 "subtitle" : c.subtitle,
                 "link"     : c.url,
                 "reason"   : c.reason,
-                "feedback" : card_feedback_info,
+                "feedback" : _feedback_info(fb_map.get(("recommend", f"card_id={c.id}"))),
                 "tags"     : c.tags,
                 "created_at": c.created_at.isoformat() if c.created_at else None,
                 "sort_order": mr.sort_order  # 혹은 필요 없다면 생략
             })
 
-        # ----- (2) 메시지에 대한 피드백 로딩
-        # category="chat", reference_id=f"message_{m.id}", user_id=current_user.id
-        fb = db.query(models.FeedbackLog).filter_by(
-            user_id=current_user.id,
-            category="chat",
-            reference_id=f"message_{m.id}"
-        ).first()
-        if fb:
-            feedback_info = {
-                "feedback_id": fb.id,
-                "feedback_score": fb.feedback_score,
-                "feedback_label": fb.feedback_label,
-                "details": fb.details
-            }
-        else:
-            feedback_info = None
-
-        thumbs = [ {"image_id": im.id, "thumb": im.thumb_b64} for im in m.images ]
+        thumbs = []
+        for im in m.images:
+            if im.thumb_key:
+                thumbs.append({"image_id": im.id, "thumb_url": f"/chat/images/{im.id}/thumb"})
+            else:   # 레거시 행은 base64 그대로
+                thumbs.append({"image_id": im.id, "thumb": im.thumb_b64})
 
         messages.append({
             "message_id": m.id,
@@ -267,61 +461,100 @@ def get_conversation_detail(
             "created_at": m.created_at,
             "cards": card_list,
             "images": thumbs,
-            "feedback": feedback_info   # ← ★ 메시지별 피드백 정보
+            # ← ★ 메시지별 피드백 정보
+            "feedback": _feedback_info(fb_map.get(("chat", f"message_{m.id}")))
         })
 
     return {
         "conversation_id": convo.id,
         "title": convo.title,
-        "messages": messages
+        "messages": messages,
+        "next_cursor": next_cursor
     }
 
-# ★ 추가: 요약해서 convo.title 로 설정하는 함수
-def summarize_conversation_title(db: Session, convo: models.Conversation):
+# ★ 추가: 요약해서 convo.title 로 설정하는 함수 (백그라운드 작업 큐에서 실행)
+
+def summarize_conversation_title(conversation_id: int):
     """
-    대화 내용(Message)을 간략히 요약하여 conversation.title 로 설정
+    대화 앞부분(Message)을 간략히 요약하여 conversation.title 로 설정
+    - 요청 경로 밖(워커 스레드)에서 실행되므로 전용 세션을 연다
+    - LLM 호출이 실패하면 예외 → 작업 큐가 재시도
+    - 제목이 아직 "Untitled chat" 일 때만 갱신 (그 사이 사용자가 바꾼 제목은 덮어쓰지 않음)
     """
-    # 1) 대화 내용을 하나의 문자열로 합침
-    text_parts = []
-    print(convo.messages)
-    for m in convo.messages:
-        # role: system, user, assistant
-        # 일단 user/assistant 메시지만 포함
-        if m.role in ("user", "assistant"):
-            text_parts.append(f"{m.role}: {m.content}")
-    joined_text = "\n".join(text_parts)
-    print(text_parts)
-    if not joined_text.strip():
-        return  # 대화가 비어있으면 그냥 둠
-
-    # 2) OpenAI 요청: "이 대화를 한 줄짜리 짧은 제목으로 요약"
-    system_prompt = (
-        "You are a helpful assistant. The user and assistant messages are shown. "
-        "Please create a concise conversation title in Korean, under 30 characters. "
-        "If there's no meaningful content, just return something like '메시지 없음'."
-    )
-    messages = [
-        {"role": "system", "content": system_prompt},
-        {"role": "user", "content": joined_text}
-    ]
+    db = SessionLocal()
     try:
+        convo = db.query(models.Conversation).filter_by(id=conversation_id).first()
+        if not convo or convo.title != UNTITLED:
+            return
+
+        # 1) 대화 앞부분만 하나의 문자열로 합침 (user/assistant 메시지만)
+        rows = (db.query(Message.role, Message.content)
+                  .filter(Message.conversation_id == conversation_id,
+                          Message.role.in_(("user", "assistant")))
+                  .order_by(Message.id)
+                  .limit(TITLE_PREFIX_MESSAGES)
+                  .all())
+        joined_text = "\n".join(f"{role}: {(content or '')[:500]}" for role, content in rows)
+        joined_text = joined_text[:TITLE_PREFIX_CHARS]
+        if not joined_text.strip():
+            return  # 대화가 비어있으면 그냥 둠
+
+        # 2) OpenAI 요청: "이 대화를 한 줄짜리 짧은 제목으로 요약"
+        system_prompt = (
+            "You are a helpful assistant. The user and assistant messages are shown. "
+            "Please create a concise conversation title in Korean, under 30 characters. "
+            "If there's no meaningful content, just return something like '메시지 없음'."
+        )
+        messages = [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": joined_text}
+        ]
         resp = client.chat.completions.create(
             model="gpt-3.5-turbo",
             messages=messages,
             max_tokens=30,
-            temperature=0.6
+            temperature=0.6,
+            timeout=20,
         )
-        new_title = resp.choices[0].message.content.strip()
-    except:
-        new_title = "(Untitled)"
+        new_title = (resp.choices[0].message.content or "").strip() or "(Untitled)"
 
-    # 제목 길이가 너무 길면 잘라냄 (30자)
-    if len(new_title) > 30:
-        new_title = new_title[:30].rstrip()
+        # 제목 길이가 너무 길면 잘라냄 (30자)
+        if len(new_title) > 30:
+            new_title = new_title[:30].rstrip()
 
-    # DB 반영
-    convo.title = new_title
-    db.commit()
+        # DB 반영 (조건부 UPDATE → 재시도/중복 실행에도 안전)
+        (db.query(models.Conversation)
+           .filter_by(id=conversation_id, title=UNTITLED)
+           .update({"title": new_title}, synchronize_session=False))
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+title_queue = BackgroundJobQueue("title", summarize_conversation_title, workers=2)
+
+def enqueue_untitled_conversations(limit: int = 100) -> int:
+    """
+    재시작 등으로 제목 작업이 유실된 대화를 다시 큐에 넣는다 (앱 시작 시 호출)
+    """
+    db = SessionLocal()
+    try:
+        ids = [cid for (cid,) in (
+            db.query(models.Conversation.id)
+              .filter(models.Conversation.title == UNTITLED,
+                      db.query(Message.id)
+                        .filter(Message.conversation_id == models.Conversation.id)
+                        .exists())
+              .order_by(models.Conversation.id.desc())
+              .limit(limit)
+              .all())]
+    finally:
+        db.close()
+    for cid in ids:
+        title_queue.submit(cid)
+    return len(ids)
 
 
 @router.patch("/conversations/{conversation_id}", status_code=200)
@@ -371,31 +604,69 @@ def delete_conversation(
     # 204 No Content
 
 
-@router.get("/images/{image_id}", status_code=200)
-def get_original_image(
-    image_id: int,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user_token),
-):
-    """
-    원본 WebP 바이너리를 그대로 돌려준다.
-    (Auth 적용 → 내 대화의 이미지만 볼 수 있게)
-    """
-    img_row = (
-        db.query(models.MessageImage)
+def _image_row(db: Session, image_id: int, user_id: int, *cols):
+    """내 대화의 이미지 행(필요한 컬럼만) 조회, 없으면 404"""
+    row = (
+        db.query(*cols)
         .join(models.Message, models.Message.id == models.MessageImage.message_id)
         .join(models.Conversation, models.Conversation.id == models.Message.conversation_id)
         .filter(
             models.MessageImage.id == image_id,
-            models.Conversation.user_id == current_user.id,
+            models.Conversation.user_id == user_id,
         )
         .first()
     )
-    if not img_row:
+    if not row:
         raise HTTPException(404, "Image not found or not yours")
+    return row
+
+def _image_response(request: Request, key: str | None, legacy_b64: str | None) -> Response:
+    """
+    blob key 가 있으면 파일을 스트리밍 (ETag = 내용 해시, If-None-Match → 304)
+    레거시 행은 base64 를 디코드해서 그대로 반환
+    """
+    headers = {"Cache-Control": "private,max-age=31536000,immutable"}
+    if key:
+        etag = f'"{key}"'
+        headers["ETag"] = etag
+        inm = request.headers.get("if-none-match", "")
+        if etag in [t.strip() for t in inm.split(",")] or inm.strip() == "*":
+            return Response(status_code=304, headers=headers)
+        path = blob_store.path(key)
+        if not os.path.exists(path):
+            raise HTTPException(404, "Image blob missing")
+        return FileResponse(path, media_type="image/webp", headers=headers)
 
     return Response(
-        content=base64.b64decode(img_row.original_b64),
+        content=base64.b64decode(legacy_b64 or ""),
         media_type="image/webp",          # ↔ PIL 의 .save(format="WEBP")
-        headers={"Cache-Control": "public,max-age=31536000"},
-    )
\ No newline at end of file
+        headers=headers,
+    )
+
+@router.get("/images/{image_id}", status_code=200)
+def get_original_image(
+    image_id: int,
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user_token),
+):
+    """
+    원본 WebP 바이너리를 그대로 돌려준다.
+    (Auth 적용 → 내 대화의 이미지만 볼 수 있게)
+    """
+    row = _image_row(db, image_id, current_user.id,
+                     models.MessageImage.original_key, models.MessageImage.original_b64)
+    return _image_response(request, row.original_key, row.original_b64)
+
+
+@router.get("/images/{image_id}/thumb", status_code=200)
+def get_thumb_image(
+    image_id: int,
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user_token),
+):
+    """썸네일 WebP (대화 상세의 thumb_url)"""
+    row = _image_row(db, image_id, current_user.id,
+                     models.MessageImage.thumb_key, models.MessageImage.thumb_b64)
+    return _image_response(request, row.thumb_key, row.thumb_b64)
@@ -8,6 +8,7 @@ from database import SessionLocal
 from .auth import get_current_user_token
 import models
 from typing import List
+from utils.personalization import invalidate_feedback
 
 router = APIRouter(prefix="/feedback", tags=["feedback"])
 
@@ -67,6 +68,7 @@ def upsert_feedback(
         db.add(fb)
     db.commit()
     db.refresh(fb)
+    invalidate_feedback(current_user.id)   # /search·/recommend 의 피드백 요약 캐시 갱신
 
     return {
         "message": "Feedback upserted",
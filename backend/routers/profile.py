@@ -6,6 +6,7 @@ from sqlalchemy.orm import Session
 from database import SessionLocal
 import models
 from .auth import get_current_user_token  # JWT 인증 함수
+from utils.personalization import bump_persona_version
 
 router = APIRouter(prefix="/profile", tags=["profile"])
 
@@ -84,6 +85,7 @@ def create_profile(
         upsert_tags(db, me.id, payload.tags)
 
     db.commit()
+    bump_persona_version(me.id)
     return {"message": "Profile created"}
 
 @router.get("/", response_model=ProfileCreate)
@@ -126,6 +128,7 @@ def update_profile(
         upsert_tags(db, me.id, payload.tags)
 
     db.commit()
+    bump_persona_version(me.id)
     return {"message": "Profile updated"}
 
 @router.delete("/", status_code=status.HTTP_204_NO_CONTENT)
@@ -141,3 +144,4 @@ def delete_profile(
     db.query(models.UserPrefTag).filter_by(user_id=me.id).delete()
     db.query(models.UserProfile).filter_by(user_id=me.id).delete()
     db.commit()
+    bump_persona_version(me.id)
@@ -1,20 +1,29 @@
 # backend/routers/recommend.py
 
-import os, json
+import os, json, time, threading
 import requests
+from concurrent.futures import ThreadPoolExecutor, wait
 from typing import List, Optional
 from fastapi import APIRouter, Depends, Query, HTTPException
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 from database import SessionLocal
 from .auth import get_current_user_token  # JWT 인증 (user_id)
 import models
 from openai import OpenAI
 import httpx
+import numpy as np
 import datetime as dt
 from zoneinfo import ZoneInfo
-from .search import google_search_cse
+from .search import google_search_cse, CSE_TIMEOUT
 from utils.personalization import recent_feedback_summaries
 from utils.cse_slim import slim_cse_item
+from utils.tokens import count_tokens
+from utils.ttl_cache import TTLCache
+from utils.source_cache import SourceCache, FRESH, MISS
+from utils.rec_cards import card_id_for_tmdb, card_id_for_url, upsert_rec_cards
+from utils.scoring import score_candidates
+from utils.reranker import get_reranker, build_features
 
 client = OpenAI(
     api_key=os.getenv("OPENAI_API_KEY"),
@@ -23,6 +32,49 @@ client = OpenAI(
 
 router = APIRouter(prefix="/recommend", tags=["recommend"])
 
+# LLM 필터 병렬화 설정
+# 동시 LLM 호출 상한 — 모든 요청이 공유하므로 소스 갱신 워커 여럿 × 소스당 묶음(~5개)이 대부분 바로 돌 만큼
+LLM_FILTER_CONCURRENCY     = int(os.getenv("LLM_FILTER_CONCURRENCY", "16"))
+LLM_FILTER_CHUNK_TOKENS    = int(os.getenv("LLM_FILTER_CHUNK_TOKENS", "1200")) # 묶음당 입력 토큰 예산
+LLM_FILTER_CHUNK_MAX_ITEMS = int(os.getenv("LLM_FILTER_CHUNK_MAX_ITEMS", "12"))
+LLM_FILTER_TIMEOUT         = float(os.getenv("LLM_FILTER_TIMEOUT", "8"))       # 묶음당 타임아웃(초)
+LLM_FILTER_GRACE           = 2.0    # 묶음별 대기 = 실행 시작 + LLM_FILTER_TIMEOUT + 여유시간
+LLM_FILTER_QUEUE_TIMEOUT   = float(os.getenv("LLM_FILTER_QUEUE_TIMEOUT", "10"))  # 풀이 바빠 시작 못 한 묶음 대기 한도(초)
+_filter_pool = ThreadPoolExecutor(max_workers=LLM_FILTER_CONCURRENCY, thread_name_prefix="llm-filter")
+
+# type 별 후보 수집(TMDB / CSE+LLM) 병렬화 설정
+# 요청당 후보 수집 대기 한도(초) — 가장 긴 경로(MISS 인 CSE 소스)의 단계별 타임아웃 합으로 정함
+#   CSE 첫 페이지 + 나머지 페이지(동시)  : 2 × CSE_TIMEOUT
+#   LLM 필터 묶음(동시)                  : LLM_FILTER_TIMEOUT + LLM_FILTER_GRACE (_filter_pool 이 밀리면 + 대기)
+#   카드 upsert/commit                   : RECOMMEND_DB_MARGIN
+# 기본값 2×4 + 8 + 2 + 1 = 19초. 단계 타임아웃을 바꾸면 따라 바뀌고, RECOMMEND_DEADLINE 을 직접 주면
+# 그 값을 씀 (합보다 작게 주거나 필터 풀이 밀리면 콜드 갱신은 응답에 못 들고 백그라운드에서 마저 저장됨)
+TMDB_TIMEOUT             = float(os.getenv("TMDB_TIMEOUT", "5"))
+RECOMMEND_DB_MARGIN      = 1.0
+RECOMMEND_DEADLINE       = float(os.getenv(
+    "RECOMMEND_DEADLINE",
+    str(2 * CSE_TIMEOUT + LLM_FILTER_TIMEOUT + LLM_FILTER_GRACE + RECOMMEND_DB_MARGIN),
+))
+RECOMMEND_SOURCE_WORKERS = int(os.getenv("RECOMMEND_SOURCE_WORKERS", "8"))
+_source_pool = ThreadPoolExecutor(max_workers=RECOMMEND_SOURCE_WORKERS, thread_name_prefix="rec-source")
+RECOMMEND_CANDIDATE_POOL = int(os.getenv("RECOMMEND_CANDIDATE_POOL", "2000"))  # 개인화 점수를 매길 최신 후보 수
+RERANKER_WEIGHT          = float(os.getenv("RERANKER_WEIGHT", "1.0"))          # 재정렬 모델 logit 반영 비율
+
+# (rec_type, 정규화 쿼리, 지역/언어) 별 소스 갱신 시각 — stale-while-revalidate
+SOURCE_SOFT_TTL = float(os.getenv("RECOMMEND_SOURCE_SOFT_TTL", "600"))     # 이내면 외부 호출 생략
+SOURCE_HARD_TTL = float(os.getenv("RECOMMEND_SOURCE_HARD_TTL", "86400"))   # 이내면 기존 카드로 응답 + 백그라운드 갱신
+SOURCE_LOCALE   = "ko-KR"   # TMDB(language/region)·CSE(lr) 모두 한국어/한국 기준으로 조회
+_source_cache = SourceCache(soft_ttl=SOURCE_SOFT_TTL, hard_ttl=SOURCE_HARD_TTL)
+
+# 항목별 LLM 필터 판정 캐시 — 같은 URL 이 여러 사용자/쿼리에서 반복되므로
+LLM_VERDICT_TTL  = float(os.getenv("LLM_VERDICT_TTL", str(6 * 3600)))
+LLM_VERDICT_SIZE = int(os.getenv("LLM_VERDICT_SIZE", "20000"))
+_verdict_cache = TTLCache(maxsize=LLM_VERDICT_SIZE, ttl=LLM_VERDICT_TTL)
+
+# 소스 갱신이 부분 성공(일부 묶음 지연/실패)으로 끝났을 때 재시도가 CSE 를 다시 호출(과금)하지 않도록
+# 검색 결과를 잠시 보관 — 끝난 묶음의 판정은 _verdict_cache 에 있으므로 재시도는 남은 묶음만 LLM 호출
+_cse_items_cache = TTLCache(maxsize=512, ttl=SOURCE_SOFT_TTL)
+
 def get_db():
     db = SessionLocal()
     try:
@@ -54,11 +106,12 @@ def search_tmdb_and_create_cards(
     """
     1) TMDB 검색
     2) 결과를 rec_cards 테이블에 저장
+    반환: 소스를 정상적으로 다 받아왔으면 True (설정 누락/API 오류면 False → 소스 캐시에 기록하지 않음)
     """
     tmdb_api_key = os.getenv("TMDB_API_KEY", "")  # 환경변수
     if not tmdb_api_key:
         print("TMDB_API_KEY not set!")
-        return
+        return False
 
     # TMDB /search/movie 예시
     # 문서: https://developers.themoviedb.org/3/search/search-movies
@@ -94,47 +147,99 @@ def search_tmdb_and_create_cards(
         print(params)
         url = "https://api.themoviedb.org/3/search/movie"
     print("[TMDB] Request params:", params)
-    resp = requests.get(url, params=params)
+    resp = requests.get(url, params=params, timeout=TMDB_TIMEOUT)
     if resp.status_code != 200:
         print(f"TMDB search error: {resp.text}")
-        return
+        return False
 
     data = resp.json()
     results = data.get("results", [])
     print("[TMDB] results:", results)
     print(results)
     if not results:
-        return
+        return True     # 정상 응답인데 결과가 없는 것
 
-    for i, r in enumerate(results):
+    # TMDB id 기반 고정 id → 같은 영화는 한 행으로 upsert (INSERT … ON CONFLICT 1회)
+    rows = []
+    for r in results:
         # ID, title, overview, release_date ...
         movie_title = r.get("title") or "(no title)"
         overview = r.get("overview") or ""
         movie_id = r.get("id")
+        if movie_id is None:
+            continue
 
         # TMDB 사이트 링크
         link = f"https://www.themoviedb.org/movie/{movie_id}"
 
-        # RecCard 생성
-        card_id = f"{rec_type}_{i}_{int(dt.datetime.utcnow().timestamp())}"
-        new_card = models.RecCard(
-            id       = card_id,
+        rows.append(dict(
+            id       = card_id_for_tmdb(rec_type, movie_id),
             type     = rec_type,
             title    = movie_title,
             subtitle = overview,
             url      = link,
             reason   = f"TMDB 검색: '{user_query}'",
             tags     = [rec_type, "tmdb_search"]
-        )
-        db.add(new_card)
+        ))
+    upsert_rec_cards(db, rows)
     db.commit()
+    return True
+
+def _normalize_query(q: str | None) -> str:
+    return " ".join((q or "").lower().split())
+
+def _verdict_key(item: dict, content_type: str, user_query: str | None, recency_days: int):
+    """(link, content_type, 정규화 쿼리, recency, 날짜 버킷) — 링크 없는 항목은 캐시 안 함"""
+    link = item.get("link")
+    if not link:
+        return None
+    return (link, content_type, _normalize_query(user_query), recency_days, dt.date.today().isoformat())
 
 def filter_recent_content_with_llm(
         items: list[dict],
         user_query: str | None = None,
         content_type: str = "general",  # 'movie', 'news', 'learn', 'content' 등
-        recency_days: int = 30  # 기본 30일, 조정 가능
-) -> list[dict]:
+        recency_days: int = 30,  # 기본 30일, 조정 가능
+        timeout: float | None = None,  # LLM 호출 1회 타임아웃(초)
+) -> tuple[list[dict], bool]:
+    """
+    항목별 판정(keep/drop) 캐시를 먼저 보고, 캐시에 없는 항목만 LLM 으로 분류한 뒤
+    원래 순서대로 keep 항목을 돌려준다.
+    반환: (keep 항목, LLM 판정 성공 여부) — 실패 시 항목은 안전 조치용 fallback
+    """
+    verdicts: dict[int, bool] = {}
+    keys = [_verdict_key(it, content_type, user_query, recency_days) for it in items]
+    for i, key in enumerate(keys):
+        if key is not None:
+            v = _verdict_cache.get(key)
+            if v is not None:
+                verdicts[i] = v
+
+    uncached = [i for i in range(len(items)) if i not in verdicts]
+    print(f"[LLM filter] cache hit {len(verdicts)}/{len(items)}")
+    if uncached:
+        sub = [items[i] for i in uncached]
+        kept = _llm_filter_items(sub, user_query, content_type, recency_days, timeout)
+        if kept is None:
+            # 오류 발생 시 (캐시로 통과한 항목 +) 미판정 원본 아이템 최대 5개 (안전 조치, 캐시하지 않음)
+            fallback = set(uncached[:5])
+            return [it for i, it in enumerate(items) if verdicts.get(i) or i in fallback], False
+        kept_ids = {id(it) for it in kept}
+        for i in uncached:
+            verdicts[i] = id(items[i]) in kept_ids
+            if keys[i] is not None:
+                _verdict_cache.put(keys[i], verdicts[i])
+
+    return [it for i, it in enumerate(items) if verdicts[i]], True
+
+def _llm_filter_items(
+        items: list[dict],
+        user_query: str | None,
+        content_type: str,
+        recency_days: int,
+        timeout: float | None,
+) -> list[dict] | None:
+    """LLM 으로 items 를 분류해 keep 항목 리스트 반환 (호출/파싱 실패 시 None)"""
     # 현재 날짜
     current_date = dt.datetime.now().strftime("%Y-%m-%d")
     
@@ -193,7 +298,8 @@ def filter_recent_content_with_llm(
                     ensure_ascii=False
                 )}
             ],
-            max_tokens=512  # 응답 크기 확대
+            max_tokens=512,  # 응답 크기 확대
+            timeout=timeout,
         )
 
         # 4) 결과 파싱 및 신뢰도 처리
@@ -211,8 +317,7 @@ def filter_recent_content_with_llm(
     
     except Exception as e:
         print(f"LLM filtering error: {e}")
-        # 오류 발생 시 원본 아이템 최대 5개만 반환 (안전 조치)
-        return items[:5]
+        return None
 
 # 헬퍼 함수: 메타데이터에서 날짜 추출
 def extract_date_from_metadata(item):
@@ -227,6 +332,71 @@ def extract_date_from_metadata(item):
     
     return None
 
+def pack_items_by_tokens(
+        items: list[dict],
+        token_budget: int = LLM_FILTER_CHUNK_TOKENS,
+        max_items: int = LLM_FILTER_CHUNK_MAX_ITEMS,
+) -> list[list[dict]]:
+    """
+    고정 8개 대신, 항목 JSON 의 토큰 수를 세어 token_budget 까지 한 묶음으로 채운다.
+    (응답의 keep 인덱스가 max_tokens 안에 들어가도록 max_items 도 제한)
+    """
+    chunks: list[list[dict]] = []
+    chunk: list[dict] = []
+    used = 0
+    for it in items:
+        cost = count_tokens(json.dumps(it, ensure_ascii=False))
+        if chunk and (used + cost > token_budget or len(chunk) >= max_items):
+            chunks.append(chunk)
+            chunk, used = [], 0
+        chunk.append(it)
+        used += cost
+    if chunk:
+        chunks.append(chunk)
+    return chunks
+
+def filter_chunks_concurrently(
+        chunks: list[list[dict]],
+        user_query: str | None,
+        content_type: str,
+        timeout: float = LLM_FILTER_TIMEOUT,
+) -> tuple[list[dict], bool]:
+    """
+    묶음별 LLM 필터를 _filter_pool(동시 호출 상한, 요청 간 공유) 에서 병렬 실행.
+    - 묶음마다 실제로 실행을 시작한 시점부터 timeout + 여유시간까지 기다림
+      (다른 요청 작업 뒤에 줄 서 있던 시간은 빼고), 시작 자체는 LLM_FILTER_QUEUE_TIMEOUT 까지
+    - 결과는 묶음 순서대로 합친다 (실패/지연 묶음은 건너뜀 → 부분 결과)
+    - 늦은 묶음도 끝까지 돌아 판정을 _verdict_cache 에 남김 → 재시도 때는 LLM 호출 없이 사용
+    반환: (통과 항목, 모든 묶음이 정상 판정됐는지)
+    """
+    started = [threading.Event() for _ in chunks]
+    started_at = [0.0] * len(chunks)
+
+    def _run(i: int, chunk: list[dict]):
+        started_at[i] = time.monotonic()
+        started[i].set()
+        return filter_recent_content_with_llm(chunk, user_query=user_query,
+                                              content_type=content_type, timeout=timeout)
+
+    submitted = time.monotonic()
+    futures = [_filter_pool.submit(_run, i, chunk) for i, chunk in enumerate(chunks)]
+    final_items: list[dict] = []
+    complete = True
+    for i, fut in enumerate(futures):
+        try:
+            if not started[i].wait(max(0.0, submitted + LLM_FILTER_QUEUE_TIMEOUT - time.monotonic())):
+                raise TimeoutError("not started (filter pool busy)")
+            wait_s = started_at[i] + timeout + LLM_FILTER_GRACE - time.monotonic()
+            kept, ok = fut.result(timeout=max(0.0, wait_s))
+        except Exception as e:
+            fut.cancel()
+            complete = False
+            print(f"[LLM filter] chunk {i + 1}/{len(chunks)} skipped: {e!r}")
+            continue
+        final_items.extend(kept)
+        complete = complete and ok
+    return final_items, complete
+
 def search_cse_and_create_cards(
     db: Session,
     query: str,               # 실제 구글 검색에 쓸 문장 (사용자 입력)
@@ -238,21 +408,31 @@ def search_cse_and_create_cards(
     1) Google Custom Search (페이징 + 최대 50개, 최근 3개월)
     2) LLM 필터 -> '최근 개봉 영화'에 진짜 부합하는 항목만
     3) RecCard DB 생성
+    반환: 검색/필터가 모두 정상이면 True (검색 결과 0건도 정상 — CSE 오류는 예외로 올라옴)
+          LLM 필터 실패/지연 → False : 부분 결과는 저장하되 소스 캐시에는 기록하지 않아 다음 요청에서 다시 시도
+          (재시도는 보관해 둔 검색 결과 + 끝난 묶음의 판정 캐시를 써서 남은 묶음만 LLM 호출)
     """
 
     print(query)
     print(user_query)
     date_restrict = "m3"  # 최근 3개월
     sort_method   = "date"
-    items = google_search_cse(
-        query=user_query,    # ← 사용자가 입력한 문장 전체로 검색
-        num=50,
-        date_restrict=date_restrict,
-        sort=sort_method
-    )
+    cse_key = (_normalize_query(user_query), date_restrict, sort_method)
+    items = _cse_items_cache.get(cse_key)
+    if items is None:
+        items = google_search_cse(
+            query=user_query,    # ← 사용자가 입력한 문장 전체로 검색
+            num=50,
+            date_restrict=date_restrict,
+            sort=sort_method
+        )
+        if items:
+            _cse_items_cache.put(cse_key, items)
+    else:
+        print(f"[recommend] CSE items cache hit ({len(items)})")
     print(items)
     if not items:
-        return
+        return True     # 정상 응답인데 결과가 없는 것
 
     # --- NEW ----------------------------------------------------
     # LLM에 넘길 때는 ‘다이어트’된 item만 사용
@@ -260,18 +440,18 @@ def search_cse_and_create_cards(
     # token 폭발을 막기 위해 snippet 길이가 큰 뉴스류면 150자로 더 자르는 것도 OK
     # ------------------------------------------------------------
 
-    # 2) LLM 필터
-    chunks = [slimmed[i:i+8] for i in range(0, len(slimmed), 8)]  # 8개씩만
-    final_items = []
-    for chunk in chunks:
-        partial_filtered = filter_recent_content_with_llm(chunk, user_query=user_query, content_type=rec_type)
-        final_items.extend(partial_filtered)
+    # 2) LLM 필터 (토큰 예산 단위로 묶어 동시에 호출, 늦거나 실패한 묶음은 제외)
+    chunks = pack_items_by_tokens(slimmed)
+    final_items, complete = filter_chunks_concurrently(chunks, user_query=user_query, content_type=rec_type)
     print(final_items)
     if not final_items:
-        return
+        if complete:
+            _cse_items_cache.pop(cse_key)
+        return complete
 
-    # 3) RecCard DB 저장
-    for i, it in enumerate(final_items):
+    # 3) RecCard DB 저장 (정규화 URL 해시 id 로 upsert → 같은 글은 중복 생성되지 않음)
+    rows = []
+    for it in final_items:
         # 만약 it가 dict가 아니면 스킵
         if not isinstance(it, dict):
             continue
@@ -279,19 +459,88 @@ def search_cse_and_create_cards(
         title = it.get("title","(no title)")
         snippet = it.get("snippet","")
         link = it.get("link","")
+        if not link:
+            continue
 
-        card_id = f"{rec_type}_{i}_{int(dt.datetime.utcnow().timestamp())}"
-        new_card = models.RecCard(
-            id       = card_id,
+        rows.append(dict(
+            id       = card_id_for_url(rec_type, link),
             type     = rec_type,
             title    = title,
             subtitle = snippet,
             url      = link,
             reason   = f"'{query}' -> LLM 필터 통과",
             tags     = [rec_type, "google_cse", "recent"]
-        )
-        db.add(new_card)
+        ))
+    upsert_rec_cards(db, rows)
     db.commit()
+    if complete:
+        _cse_items_cache.pop(cse_key)   # 완전한 갱신 → 다음 갱신(soft TTL 이후)은 새로 검색
+    return complete
+
+class SourceRefreshError(RuntimeError):
+    """소스 갱신이 실패/부분 성공 — _source_cache 에 갱신 시각을 남기지 않도록 예외로 알림"""
+
+
+def _refresh_source(rec_type: str, search_txt: str, client_tz: dt.tzinfo):
+    """
+    type 1개의 후보 카드 생성 (워커 스레드 → 요청 세션과 분리된 전용 세션 사용)
+    빌더가 실패/부분 결과를 알리면 SourceRefreshError → 해당 키는 FRESH 로 기록되지 않음
+    """
+    db = SessionLocal()
+    try:
+        if rec_type == "movie":
+            ok = search_tmdb_and_create_cards(db=db, user_query=search_txt, rec_type="movie")
+        else:
+            ok = search_cse_and_create_cards(
+                db=db,
+                query=search_txt,
+                rec_type=rec_type,
+                client_tz=client_tz,
+                user_query=search_txt
+            )
+    finally:
+        db.close()
+    if not ok:
+        raise SourceRefreshError(f"{rec_type!r} source refresh incomplete for {search_txt!r}")
+
+def refresh_sources_concurrently(
+    type_list: list[str],
+    user_query: Optional[str],
+    client_tz: dt.tzinfo,
+    deadline: float = RECOMMEND_DEADLINE,
+) -> list[str]:
+    """
+    type 별 후보 수집을 _source_pool 에서 동시에 실행하고, 공통 deadline(초) 까지만 기다린다.
+    _source_cache(stale-while-revalidate) 기준으로
+      - FRESH : 외부 호출 없음
+      - STALE : 백그라운드 갱신만 걸고 기다리지 않음 (기존 카드로 즉시 응답)
+      - MISS  : 갱신을 deadline 까지 기다림
+    반환: deadline 안에 끝난 type 목록
+    """
+    futures = {}
+    for t in dict.fromkeys(type_list):          # 순서 유지 중복 제거
+        search_txt = user_query if user_query else ("최근 개봉한 영화" if t == "movie" else t)
+        key = (t, _normalize_query(search_txt), SOURCE_LOCALE)
+        state = _source_cache.lookup(key)
+        print(f"[recommend] source cache {t!r}: {state}")
+        if state == FRESH:
+            continue
+        fut = _source_cache.refresh(key, _source_pool, _refresh_source, t, search_txt, client_tz)
+        if state == MISS:
+            futures[fut] = t
+
+    if not futures:
+        return []
+    done, not_done = wait(futures, timeout=deadline)
+    finished = []
+    for fut in done:
+        if fut.exception():
+            print(f"[recommend] source '{futures[fut]}' failed: {fut.exception()!r}")
+        else:
+            finished.append(futures[fut])
+    for fut in not_done:
+        print(f"[recommend] source '{futures[fut]}' missed {deadline}s deadline (continues in background)")
+    return finished
 
 @router.get("/")
 def get_recommendations(
@@ -304,7 +553,7 @@ def get_recommendations(
 ):
     """
     GET /recommend?types=content,learn,movie&user_query=...
-      - movie일 땐 TMDB 검색 / 그 외는 기존 구글CSE+ChatGPT
+      - movie일 땐 TMDB 검색 / 그 외는 기존 구글CSE+ChatGPT (type 별로 동시에, 공통 deadline)
       - 결과 중복제거 후 limit개 반환
     """
 
@@ -323,36 +572,12 @@ def get_recommendations(
         type_list = [t.strip() for t in types.split(",") if t.strip()]
     print(type_list)
 
-    # 3) 만약 "movie"가 포함되어 있으면 -> TMDB 검색
-    #    (만약 "movie" 외 다른 것도 있으면? -> 여기서는 우선 movie 우선)
-    if "movie" in type_list:
-        search_txt = user_query if user_query else "최근 개봉한 영화"
-        # TMDB 검색으로 rec_cards 추가
-        search_tmdb_and_create_cards(
-            db=db,
-            user_query=search_txt,
-            rec_type="movie"
-        )
+    # 3) 요청된 모든 type 의 후보를 동시에 갱신 (movie → TMDB, 그 외 → 구글CSE+ChatGPT)
+    #    RECOMMEND_DEADLINE 안에 끝난 것만 이번 응답에 반영, 늦은 작업은 백그라운드에서 마저 저장
+    if type_list:
+        refresh_sources_concurrently(type_list, user_query, client_tz)
 
-    # 4) 남아있는 type_list (content, learn 등) -> 구글+ChatGPT
-    #    예) "content, movie"면 위에서 "movie" 처리 -> 남은건 "content"
-    elif type_list:
-        # 하나 이상 남았다면 -> ex) "content"
-        # 만약 여러개(learn, wellness...)라면 -> 구글+ChatGPT 처리
-        for t in type_list:
-            # ex) user_query="백엔드 학습자료"
-            #    search_cse_and_create_cards(..., rec_type=t)
-            search_txt = user_query if user_query else t
-            search_cse_and_create_cards(
-                db=db,
-                query=search_txt,
-                rec_type=t,
-                client_tz=client_tz,
-                user_query=search_txt
-            )
-            break
-
-    # 5) DB에서 최종 후보 쿼리 (movie, content, etc)
+    # 4) DB에서 최종 후보 쿼리 (movie, content, etc)
     q = db.query(models.RecCard)
     # 만약 types==None, or types=="movie" only -> we've inserted "movie" cards
     # 만약 types=="content,movie", etc
@@ -361,65 +586,102 @@ def get_recommendations(
     if all_types:
         q = q.filter(models.RecCard.type.in_(all_types))
 
-    # 최신순 20개
-    candidates = q.order_by(models.RecCard.created_at.desc()).limit(20).all()
+    # 최근 갱신순 RECOMMEND_CANDIDATE_POOL 개 (점수 계산에 필요한 컬럼만)
+    # 최신성 점수는 created_at(처음 생성 시각) 기준 — 재학습 데이터와 같은 값
+    candidates = (q.with_entities(models.RecCard.id, models.RecCard.type, models.RecCard.title,
+                                  models.RecCard.tags, models.RecCard.created_at)
+                   .order_by(models.RecCard.refreshed_at.desc())
+                   .limit(RECOMMEND_CANDIDATE_POOL)
+                   .all())
     if not candidates:
         return []
+    cand_ids = [c.id for c in candidates]
 
-    # ==== 1) 개인화 스코어 계산 ========================================
+    # ==== 1) 개인화 스코어 계산 (NumPy 로 후보 전체를 한 번에) ============
     fb = recent_feedback_summaries(db, current_user, 50)
     like_ids    = {x["id"] for x in fb["likes"]}
     dislike_ids = {x["id"] for x in fb["dislikes"]}
 
     tag_weights = { t.tag: t.weight for t in current_user.pref_tags }
 
-    def score(card:models.RecCard)->float:
-        # 기본 = 최신일수록 +0.01 (timestamp)
-        s = card.created_at.timestamp()*1e-13               # 0~1 범위 조정
-        # 장르 점수
-        for g in card.tags:
-            s += tag_weights.get(g,0)*0.5
-        # 피드백 반영
-        if card.id   in like_ids:    s += 3
-        if card.id   in dislike_ids: s -= 3
-        return s
+    # 사용자별 노출 이력 (card_id, action) → 횟수
+    impressions = {
+        (cid, action): cnt
+        for cid, action, cnt in (
+            db.query(models.RecImpression.card_id, models.RecImpression.action, func.count())
+              .filter(models.RecImpression.user_id == current_user.id,
+                      models.RecImpression.action.in_(("viewed", "dismissed")))
+              .group_by(models.RecImpression.card_id, models.RecImpression.action)
+        )
+    }
+
+    scores = score_candidates(
+        cand_ids,
+        [c.created_at for c in candidates],
+        [c.tags for c in candidates],
+        tag_weights,
+        like_ids, dislike_ids, impressions,
+    )
+
+    # 학습된 재정렬 모델이 있으면 후보 전체의 logit 을 한 번에 더함
+    reranker = get_reranker()
+    if reranker is not None:
+        feats = build_features(
+            [c.type for c in candidates],
+            [c.tags for c in candidates],
+            [c.created_at for c in candidates],
+            tag_weights,
+            [impressions.get((cid, "viewed"), 0) for cid in cand_ids],
+            dt.datetime.utcnow(),
+        )
+        scores += RERANKER_WEIGHT * reranker.logit(feats)
 
     # ==== 2) 스코어로 소트 후 중복제거 =================================
-    result = []
+    picked = []
     seen_titles = set()
-    count = 0
-    for c in sorted(candidates, key=score, reverse=True):
+    for i in np.argsort(-scores, kind="stable"):
+        c = candidates[i]
         if c.title not in seen_titles:
-            # feedback_logs 찾아본다
-            fb = db.query(models.FeedbackLog).filter_by(
-                user_id = current_user.id,
-                category="recommend",
-                reference_id=f"card_id={c.id}"   # or just c.id
-            ).first()
-
-            feedback_info = None
-            if fb:
-                feedback_info = {
-                    "feedback_id": fb.id,
-                    "feedback_score": fb.feedback_score,
-                    "feedback_label": fb.feedback_label,
-                    "details": fb.details
-                }
-
-            result.append({
-                "card_id": c.id,
-                "type": c.type,
-                "title": c.title,
-                "subtitle": c.subtitle,
-                "link": c.url,
-                "reason": c.reason,
-                "feedback": feedback_info
-            })
+            picked.append(c.id)
             seen_titles.add(c.title)
-            count += 1
-            if count >= limit:
+            if len(picked) >= limit:
                 break
 
+    # 선택된 카드 본문 + feedback_logs 를 한 번씩만 조회
+    cards = {c.id: c for c in db.query(models.RecCard).filter(models.RecCard.id.in_(picked))}
+    fb_rows = {}
+    for f in (db.query(models.FeedbackLog)
+                .filter(models.FeedbackLog.user_id == current_user.id,
+                        models.FeedbackLog.category == "recommend",
+                        models.FeedbackLog.reference_id.in_([f"card_id={cid}" for cid in picked]))
+                .order_by(models.FeedbackLog.id)):
+        fb_rows.setdefault(f.reference_id, f)
+
+    result = []
+    for cid in picked:
+        c = cards.get(cid)
+        if c is None:
+            continue
+        f = fb_rows.get(f"card_id={cid}")
+        feedback_info = None
+        if f:
+            feedback_info = {
+                "feedback_id": f.id,
+                "feedback_score": f.feedback_score,
+                "feedback_label": f.feedback_label,
+                "details": f.details
+            }
+
+        result.append({
+            "card_id": c.id,
+            "type": c.type,
+            "title": c.title,
+            "subtitle": c.subtitle,
+            "link": c.url,
+            "reason": c.reason,
+            "feedback": feedback_info
+        })
+
     return result
 
 
@@ -456,9 +718,10 @@ def get_models():
     GET /recommend/models
     - 현재 사용 중인 추천 모델들(또는 버전 정보) 간단히 반환
     """
-    # 실제로는 DB 또는 config 에서 읽어올 수 있음
+    reranker = get_reranker()
     return {
         "candidate_model": "basic_sql_filter_v1",
-        "rerank_model": "openai_chat_gpt_3.5_turbo",
-        "version": "2025-04-01"
+        "score_model": "numpy_tag_recency_v1",
+        "rerank_model": reranker.info() if reranker else None,
+        "version": reranker.version if reranker else "rules-only"
     }
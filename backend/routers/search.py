@@ -6,13 +6,14 @@ import requests
 from openai import OpenAI
 import httpx
 from typing import List
+from concurrent.futures import ThreadPoolExecutor
 from fastapi import APIRouter, HTTPException, Depends
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
 
 from database import SessionLocal
 from .auth import get_current_user_token  # JWT 인증 함수
-from utils.personalization import recent_feedback_summaries, make_persona_prompt
+from utils.personalization import get_persona_snapshot
 import models
 
 router = APIRouter(prefix="/search", tags=["search"])
@@ -23,6 +24,10 @@ client = OpenAI(
 )
 GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY", "YOUR_GOOGLE_API_KEY_HERE")
 GOOGLE_CSE_ID = os.getenv("GOOGLE_CSE_ID", "YOUR_GOOGLE_CSE_ID_HERE")
+# 로컬 stub 서버로 바꿔 끼울 수 있도록 엔드포인트도 환경변수로
+GOOGLE_CSE_URL = os.getenv("GOOGLE_CSE_URL", "https://www.googleapis.com/customsearch/v1")
+CSE_MAX_CONCURRENCY = int(os.getenv("CSE_MAX_CONCURRENCY", "5"))
+CSE_TIMEOUT         = float(os.getenv("CSE_TIMEOUT", "4"))     # 페이지 요청 1회 타임아웃(초)
 
 def get_db():
     db = SessionLocal()
@@ -35,27 +40,37 @@ class SearchRequest(BaseModel):
     query: str
     conversation_id: int | None = None   # 새로 추가
 
+# CSE 페이지 요청용 공유 커넥션 풀 + 페이지 동시 호출용 스레드 풀
+_cse_http = httpx.Client(
+    timeout=CSE_TIMEOUT,
+    limits=httpx.Limits(max_connections=20, max_keepalive_connections=10),
+)
+_cse_pool = ThreadPoolExecutor(max_workers=CSE_MAX_CONCURRENCY, thread_name_prefix="cse-page")
+
+def _fetch_cse_page(params: dict) -> List[dict]:
+    resp = _cse_http.get(GOOGLE_CSE_URL, params=params)
+    resp.raise_for_status()
+    return resp.json().get("items", [])
+
 def google_search_cse(query: str, num=5, date_restrict=None, sort=None) -> List[dict]:
     """
     Google CSE를 호출해 결과 items[]를 합쳐서 반환.
     items[i]는 {"title":..., "snippet":..., "link":...}를 포함.
-    만약 num > 10이면, 10개씩 페이징하여 여러 번 호출 후 결과를 합칩니다.
+    만약 num > 10이면 첫 페이지(10개)를 먼저 받아 보고, 꽉 차 있을 때만 나머지 페이지를 **동시에** 호출해
+    start 순서대로 합칩니다. (첫 페이지가 덜 차면 결과가 더 없으므로 추가 호출/과금 없음)
+    - 어떤 페이지가 요청한 개수보다 적게 돌아오면 그 뒤 페이지 결과는 버립니다 (기존 조기 중단과 동일한 결과)
+    - 첫 페이지 실패는 예외 그대로, 이후 페이지 실패는 그 앞까지의 결과만 반환
     """
-    all_items: List[dict] = []
     max_per_request = 10
 
     # 페이징 계산
     total_needed = max(num, 1)         # 최소 1
     pages = (total_needed + max_per_request - 1) // max_per_request  # 올림
 
+    page_params = []
     for page_index in range(pages):
-        # 이번 요청에서 가져올 개수(최대 10)
-        remaining = total_needed - len(all_items)
-        if remaining <= 0:
-            break
-
-        fetch_size = min(remaining, max_per_request)
         start = page_index * max_per_request + 1  # 1-based index
+        fetch_size = min(total_needed - page_index * max_per_request, max_per_request)
 
         # 공통 파라미터
         params = {
@@ -64,23 +79,33 @@ def google_search_cse(query: str, num=5, date_restrict=None, sort=None) -> List[
             "q"   : query,
             "lr"  : "lang_ko",
             "num" : fetch_size,    # 이번에 가져올 개수 (최대 10)
-            "start": start,        # 다음 페이지 시작
+            "start": start,        # 이 페이지 시작
         }
         if date_restrict:
             params["dateRestrict"] = date_restrict
         if sort:
             params["sort"] = sort
-
-        resp = requests.get("https://www.googleapis.com/customsearch/v1", params=params)
-        resp.raise_for_status()
-        data = resp.json()
-
-        batch = data.get("items", [])
+        page_params.append(params)
+
+    # 1) 첫 페이지만 먼저 — 덜 찼으면(또는 한 페이지짜리 요청이면) 여기서 끝
+    all_items: List[dict] = _fetch_cse_page(page_params[0])
+    if len(page_params) == 1 or len(all_items) < page_params[0]["num"]:
+        return all_items
+
+    # 2) 나머지 페이지 동시 발사 → 제출 순서(start 순)대로 합침
+    futures = [_cse_pool.submit(_fetch_cse_page, params) for params in page_params[1:]]
+    for params, fut in zip(page_params[1:], futures):
+        try:
+            batch = fut.result()
+        except Exception as e:
+            print(f"[CSE] page start={params['start']} failed → 앞 페이지까지만 반환: {e}")
+            break
         all_items.extend(batch)
-
-        # 혹시 결과가 실제로 더 적게 나온 경우 중단
-        if len(batch) < fetch_size:
+        # 결과가 실제로 더 적게 나온 페이지 이후는 버림 (에러가 났더라도 무시)
+        if len(batch) < params["num"]:
             break
+    for fut in futures:
+        fut.cancel()        # 아직 시작 안 한 뒤 페이지는 호출하지 않음
 
     return all_items
 
@@ -121,7 +146,7 @@ def search_and_summarize(
 
     # 2) Google Search
     try:
-        url = "https://www.googleapis.com/customsearch/v1"
+        url = GOOGLE_CSE_URL
         params = {
             "key": GOOGLE_API_KEY,
             "cx": GOOGLE_CSE_ID,
@@ -166,18 +191,11 @@ def search_and_summarize(
     ]
 
     # ▒▒▒▒▒▒▒▒▒▒▒▒▒ ▒ Personalization Block ▒ ▒▒▒▒▒▒▒▒▒▒▒▒▒
-    # ① 유저 프로필 & 피드백 취합 → JSON
-    profile_row = db.query(models.UserProfile).filter_by(user_id=current_user.id).first()
-    persona = {
-        "locale": profile_row.locale if profile_row else "ko",
-        "genres": {g.genre: g.score for g in current_user.pref_genres},
-        "tags":   [{"type": t.tag_type, "tag": t.tag, "weight": t.weight}
-                   for t in current_user.pref_tags],
-        "recent_feedback": recent_feedback_summaries(db, current_user, 50)
-    }
+    # ① 유저 프로필 & 피드백 → persona 스냅샷 (변경 시에만 다시 만듦, prompt 는 미리 렌더링)
+    persona = get_persona_snapshot(db, current_user)
     messages.insert(0, {
         "role": "system",
-        "content": make_persona_prompt(persona)
+        "content": persona["prompt"]
     })
     print(messages)
 
@@ -1,5 +1,4 @@
 import os
-import io
 from typing import Annotated
 
 from fastapi import APIRouter, UploadFile, File, Form, Depends, HTTPException
@@ -8,10 +7,13 @@ from sqlalchemy.orm import Session
 from openai import AsyncOpenAI
 import httpx
 
-from routers.chat import ChatRequest, chat as chat_endpoint   # ← 기존 /chat 재사용
+from routers.chat import ChatRequest, run_chat_async          # ← 기존 /chat 파이프라인 재사용
 from .auth   import get_current_user_token                    # JWT 검증
 from database import SessionLocal
 import models
+from utils.uploads import hash_upload, UploadTooLarge
+
+STT_MAX_BYTES = int(os.getenv("STT_MAX_BYTES", str(25 * 1024 * 1024)))   # Whisper API 업로드 한도
 
 client = AsyncOpenAI(
     api_key=os.getenv("OPENAI_API_KEY"),
@@ -30,13 +32,17 @@ def get_db():
 async def whisper_stt(file: UploadFile):
     if file.content_type.split("/")[0] != "audio":
         raise HTTPException(400, "file must be audio/*")
-    
-    audio_bytes = await file.read()           # SpooledTemporaryFile → bytes
-    wrapped_io  = io.BytesIO(audio_bytes)     # io.IOBase 구현체
+
+    # 업로드(SpooledTemporaryFile)를 청크 단위로 해시/크기 검사 → 되감은 파일 객체를 그대로 전달
+    try:
+        digest, size = await hash_upload(file, STT_MAX_BYTES)
+    except UploadTooLarge as e:
+        raise HTTPException(413, str(e))
+    print(f"[STT] {size} bytes sha256={digest[:12]}")
 
     resp = await client.audio.transcriptions.create(
      model="whisper-1",
-     file=(file.filename or "speech.webm", wrapped_io),
+     file=(file.filename or "speech.webm", file.file),
      response_format="json",
      temperature=0.0
     )
@@ -51,7 +57,6 @@ async def speech_chat(
     conversation_id: int | None = Form(None),
     timezone:        str | None = Form(None),
     audio: UploadFile = File(...),
-    db : Session     = Depends(get_db),
     me : models.User = Depends(get_current_user_token)
 ):
     """
@@ -70,8 +75,8 @@ async def speech_chat(
         question        = text,
         timezone        = timezone
     )
-    # 기존 chat 로직 호출 (의존성 직접 주입)
-    resp = chat_endpoint(req, db=db, me=me)
+    # 기존 chat 파이프라인을 chat 전용 스레드 풀에서 실행 (이벤트 루프를 막지 않음)
+    resp = await run_chat_async(req, me.id)
     resp["stt_confidence"] = conf
     resp["transcript"]     = text
     return JSONResponse(resp)
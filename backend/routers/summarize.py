@@ -1,22 +1,20 @@
 # backend/routers/summarize.py
 
 import os
-import io
-import httpx
-from openai import OpenAI
-import pdfplumber
 from fastapi import APIRouter, HTTPException, Depends, UploadFile, File, Form
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from database import SessionLocal
 from .auth import get_current_user_token
 import models
+from utils.summarize_pipeline import summarize_pages, SUMMARY_VERSION
+from utils.pdf_extract import iter_pdf_pages, PdfLimitError, PdfExtractError, PDF_MAX_BYTES
+from utils.summary_cache import summary_cache
+from utils.uploads import spool_to_tempfile, hash_upload, iter_text_blocks, UploadTooLarge
 
 router = APIRouter(prefix="/summarize", tags=["summarize"])
 
-client = OpenAI(
-    api_key=os.getenv("OPENAI_API_KEY"),
-    http_client=httpx.Client(),          # proxies 파라미터 없음
-)
+SUMMARIZE_TEXT_MAX_BYTES = int(os.getenv("SUMMARIZE_TEXT_MAX_BYTES", str(5 * 1024 * 1024)))
 
 def get_db():
     db = SessionLocal()
@@ -25,6 +23,17 @@ def get_db():
     finally:
         db.close()
 
+async def _recording(pages, out: list[str]):
+    """페이지를 그대로 흘려보내면서 캐시에 저장할 추출 텍스트를 모음"""
+    if hasattr(pages, "__aiter__"):
+        async for p in pages:
+            out.append(p)
+            yield p
+    else:
+        for p in pages:
+            out.append(p)
+            yield p
+
 @router.post("/")
 async def summarize_file(
     file: UploadFile = File(...),
@@ -57,32 +66,66 @@ async def summarize_file(
         db.commit()
         db.refresh(conversation_obj)
 
-    # 2) 파일 내용 추출
-    content_text = ""
+    # 2) 파일 내용 추출 (페이지 단위 — 요약 파이프라인이 페이지/문단 경계로 chunk 분할)
+    #    PDF 는 임시 파일로 옮긴 뒤 프로세스 풀에서 페이지 범위별로 추출, 나오는 대로 요약 시작
+    #    같은 파일(sha256)이면 캐시된 요약/추출 텍스트 사용
+    pdf_path = None
+    cached = False
     print(file.content_type)
     try:
-        if file.content_type == "application/pdf":
-            pdf_bytes = await file.read()  # 파일 전체 읽기
+        # 청크 단위로 해시/크기 검사하며 읽음 → 한도 초과면 끝까지 읽지 않고 413
+        try:
+            if file.content_type == "application/pdf":
+                pdf_path, digest, _ = await spool_to_tempfile(file, PDF_MAX_BYTES, suffix=".pdf")
+
+            elif file.content_type in ["text/plain", "text/markdown", "application/octet-stream"]:
+                digest, _ = await hash_upload(file, SUMMARIZE_TEXT_MAX_BYTES)
+            else:
+                raise HTTPException(status_code=400, detail="Unsupported file type")
+        except UploadTooLarge as e:
+            raise HTTPException(status_code=413, detail=str(e))
+
+        summary = await run_in_threadpool(summary_cache.get_summary, digest, SUMMARY_VERSION)
+        if summary is not None:
+            cached = True
+            print(f"[SUMMARY_CACHE] hit {digest[:12]}")
+        else:
+            extracted: list[str] = []
+            cached_pages = await run_in_threadpool(summary_cache.get_text, digest)
+            if cached_pages is not None:
+                pages = cached_pages
+            elif pdf_path:
+                pages = _recording(iter_pdf_pages(pdf_path), extracted)
+            else:
+                # 텍스트는 통째로 읽지 않고 블록 단위로 디코딩해 바로 chunk 분할로
+                pages = _recording(iter_text_blocks(file), extracted)
+
+            # 3) OpenAI를 이용해 "어떤 언어든 한글 요약" (map-reduce)
+            #    토큰 예산 단위 chunk 를 동시에 요약한 뒤 계층적으로 합침 → 문서 전체 반영
             try:
-                with pdfplumber.open(io.BytesIO(pdf_bytes)) as pdf:
-                    all_pages = []
-                    for page in pdf.pages:
-                        if page is not None:
-                            text = page.extract_text() or ""
-                            all_pages.append(text)
-                    content_text = "\n".join(all_pages)
-            except Exception as e:
+                summary = await summarize_pages(pages)
+            except PdfLimitError as e:
+                raise HTTPException(status_code=413, detail=str(e))
+            except PdfExtractError as e:
                 raise HTTPException(status_code=500, detail=f"pdfplumber error: {str(e)}")
+            except Exception as e:
+                raise HTTPException(status_code=500, detail=f"OpenAI error: {str(e)}")
 
-        elif file.content_type in ["text/plain", "text/markdown", "application/octet-stream"]:
-            raw_bytes = await file.read()
-            content_text = raw_bytes.decode("utf-8", errors="ignore")
-        else:
-            raise HTTPException(status_code=400, detail="Unsupported file type")
+            try:
+                if cached_pages is None:
+                    await run_in_threadpool(summary_cache.put_text, digest, extracted)
+                await run_in_threadpool(summary_cache.put_summary, digest, SUMMARY_VERSION, summary)
+            except OSError as e:
+                print(f"[SUMMARY_CACHE] write failed: {e}")
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"File read error: {str(e)}")
+    finally:
+        if pdf_path:
+            os.unlink(pdf_path)
 
-    if not content_text.strip():
+    if not summary.strip():
         # 파일에서 내용이 거의 없는 경우
         user_msg = models.Message(
             conversation_id=conversation_obj.id,
@@ -96,30 +139,9 @@ async def summarize_file(
             "conversation_id": conversation_obj.id,
             "filename": file.filename,
             "summary": "(No text extracted)",
+            "cached": cached,
         }
 
-    # 3) OpenAI를 이용해 "어떤 언어든 한글 요약" 프롬프트
-    # Token 제한 고려 (대규모 문서면 chunk 분리)
-    system_prompt = (
-        "You are a helpful assistant. The user has uploaded a document in an unknown language. "
-        "Your job is to provide a summary in Korean (regardless of the original document language). "
-        "Please keep it concise and clear in Korean."
-    )
-
-    messages = [
-        {"role": "system", "content": system_prompt},
-        {"role": "user", "content": content_text[:8000]}  # 8K substring (임시)
-    ]
-
-    try:
-        rsp = client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=messages
-        )
-        summary = rsp.choices[0].message.content
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"OpenAI error: {str(e)}")
-
     # 4) DB 저장 (user: "[파일요약] filename", assistant: summary)
     user_msg = models.Message(
         conversation_id=conversation_obj.id,
@@ -140,4 +162,5 @@ async def summarize_file(
         "conversation_id": conversation_obj.id,
         "filename": file.filename,
         "summary": summary,
+        "cached": cached,
     }
@@ -0,0 +1,38 @@
+# tests/conftest.py
+"""
+백엔드 테스트 공통 설정
+- 앱 모듈(database, routers …)이 import 시점에 환경 변수를 읽으므로 먼저 채워 둠
+- db : 테스트마다 새 in-memory sqlite 세션 (Postgres 전용 ARRAY 컬럼은 JSON 으로 바꿔 생성)
+"""
+import os, sys
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("OPENAI_API_KEY", "test")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from sqlalchemy import create_engine, JSON, ARRAY
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import models
+
+for _table in models.Base.metadata.tables.values():
+    for _col in _table.columns:
+        if isinstance(_col.type, ARRAY):
+            _col.type = JSON()
+
+
+@pytest.fixture
+def engine():
+    eng = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    models.Base.metadata.create_all(eng)
+    yield eng
+    eng.dispose()
+
+
+@pytest.fixture
+def db(engine):
+    session = sessionmaker(bind=engine, autoflush=False)()
+    yield session
+    session.close()
@@ -0,0 +1,81 @@
+# tests/cse_stub.py
+"""
+Google Custom Search 로컬 stub 서버 (GOOGLE_CSE_URL 로 바꿔 끼워 사용)
+- 전체 결과 total 개 중 start/num 에 해당하는 items 를 돌려줌 (실제 API 와 같은 1-based start)
+- fail_starts 에 든 start 요청은 500
+- 받은 요청의 start 값을 requests 에 기록 (페이지 호출/과금 횟수 확인용)
+
+직접 띄우기:  python tests/cse_stub.py --port 8765 --total 23
+          →  GOOGLE_CSE_URL=http://127.0.0.1:8765/customsearch/v1
+"""
+import json, argparse, threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+
+class CseStub:
+    def __init__(self, total: int = 100, fail_starts: set[int] | None = None,
+                 host: str = "127.0.0.1", port: int = 0):
+        self.total = total
+        self.fail_starts = set(fail_starts or ())
+        self.requests: list[int] = []
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._thread: threading.Thread | None = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/customsearch/v1"
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                qs = parse_qs(urlparse(self.path).query)
+                start = int(qs.get("start", ["1"])[0])
+                num = int(qs.get("num", ["10"])[0])
+                q = qs.get("q", [""])[0]
+                with stub._lock:
+                    stub.requests.append(start)
+                if start in stub.fail_starts:
+                    self.send_response(500)
+                    self.end_headers()
+                    return
+                items = [{"title": f"{q} #{i}", "snippet": f"snippet {i}", "link": f"https://example.com/{i}"}
+                         for i in range(start, min(start + num, stub.total + 1))]
+                body = json.dumps({"items": items} if items else {}).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def serve_forever(self):
+        self._server.serve_forever()
+
+    def start(self) -> "CseStub":
+        """백그라운드 스레드로 실행 (테스트용)"""
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Google CSE stub server")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--total", type=int, default=100)
+    args = ap.parse_args()
+    stub = CseStub(total=args.total, port=args.port)
+    print(f"[CSE_STUB] {stub.url} (total={args.total})")
+    stub.serve_forever()
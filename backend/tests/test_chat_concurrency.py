@@ -0,0 +1,70 @@
+# tests/test_chat_concurrency.py
+"""async /chat 경로(run_chat_async) 동시 실행 — 워커 수만큼 병렬, 그 이상은 대기, DB 풀 안에서"""
+import asyncio, threading, time
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool
+
+import models
+import routers.chat as chat
+from database import DB_MAX_CONNECTIONS
+
+
+def test_chat_workers_fit_in_db_pool():
+    assert 1 <= chat.CHAT_WORKERS <= max(DB_MAX_CONNECTIONS - chat.CHAT_DB_HEADROOM, 1)
+
+
+@pytest.fixture
+def pooled_sessions(tmp_path, monkeypatch):
+    """운영과 같은 QueuePool(크기 = CHAT_WORKERS, overflow 없음, 대기 1초) 파일 sqlite"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'chat.db'}", poolclass=QueuePool,
+                           pool_size=chat.CHAT_WORKERS, max_overflow=0, pool_timeout=1,
+                           connect_args={"check_same_thread": False})
+    models.Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine, autoflush=False)
+    with Session() as db:
+        user = models.User(username="load", password="x")
+        db.add(user); db.commit()
+        user_id = user.id
+    monkeypatch.setattr(chat, "SessionLocal", Session)
+    yield user_id
+    engine.dispose()
+
+
+def test_concurrent_chats_run_in_parallel_up_to_worker_limit(pooled_sessions, monkeypatch):
+    user_id = pooled_sessions
+    workers = chat.CHAT_WORKERS
+    delay = 0.2
+    lock = threading.Lock()
+    running = peak = 0
+
+    def fake_pipeline(db, me, req, on_event=None):
+        nonlocal running, peak
+        with lock:
+            running += 1
+            peak = max(peak, running)
+        try:
+            db.query(models.Conversation).filter_by(user_id=me.id).count()   # 세션 커넥션 사용
+            time.sleep(delay)       # LLM/툴 호출 대기
+        finally:
+            with lock:
+                running -= 1
+        return {"conversation_id": None, "answer": req.question, "cards": []}
+
+    monkeypatch.setattr(chat, "_chat_pipeline", fake_pipeline)
+
+    async def load(n: int):
+        t0 = time.perf_counter()
+        results = await asyncio.gather(*[
+            chat.run_chat_async(chat.ChatRequest(question=f"q{i}"), user_id) for i in range(n)
+        ])
+        return results, time.perf_counter() - t0
+
+    rounds = 3
+    results, elapsed = asyncio.run(load(workers * rounds))
+
+    assert [r["answer"] for r in results] == [f"q{i}" for i in range(workers * rounds)]
+    assert peak == workers                          # 워커 수까지는 동시에, 그 이상은 큐에서 대기
+    assert elapsed < delay * rounds * 2             # 직렬(workers × rounds × delay)이 아님
@@ -0,0 +1,81 @@
+# tests/test_chat_stream.py
+"""/chat/stream — 단일 스텝 에이전트 답변이 token 이벤트 여러 개로 흘러오는지"""
+import asyncio, json
+
+import pytest
+from langchain.agents import AgentExecutor, create_openai_tools_agent
+from langchain.prompts import ChatPromptTemplate, MessagesPlaceholder
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.tools import tool
+from sqlalchemy.orm import sessionmaker
+
+import agent as agent_mod
+import models
+import routers.chat as chat
+
+ANSWER = "오늘 서울 날씨는 맑고 따뜻합니다"
+
+
+class _FakeToolLLM(GenericFakeChatModel):
+    def bind_tools(self, tools, **kwargs):
+        return self
+
+
+@tool
+def noop(x: str) -> str:
+    """아무것도 안 함"""
+    return x
+
+
+def test_stream_llm_has_streaming_enabled():
+    assert agent_mod._stream_llm.streaming is True
+    assert agent_mod._llm.streaming is False
+
+
+@pytest.fixture
+def chat_env(engine, monkeypatch):
+    Session = sessionmaker(bind=engine, autoflush=False)
+    with Session() as db:
+        me = models.User(username="stream", password="x")
+        db.add(me); db.commit(); db.refresh(me)
+        db.expunge(me)
+    monkeypatch.setattr(chat, "SessionLocal", Session)
+    monkeypatch.setattr(chat.title_queue, "submit", lambda key: None)
+
+    calls = []
+
+    def fake_build_agent(db, user, tz, history=None, streaming=False):
+        calls.append(streaming)
+        llm = _FakeToolLLM(messages=iter([AIMessage(content=ANSWER)]))
+        prompt = ChatPromptTemplate.from_messages([("human", "{input}"), MessagesPlaceholder("agent_scratchpad")])
+        return AgentExecutor(agent=create_openai_tools_agent(llm, [noop], prompt), tools=[noop])
+
+    monkeypatch.setattr(chat, "build_agent", fake_build_agent)
+    return me, calls
+
+
+def _parse_sse(raw: str) -> list[tuple[str, dict]]:
+    events = []
+    for block in raw.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+def test_single_step_answer_streams_multiple_tokens_before_done(chat_env):
+    me, calls = chat_env
+
+    async def run():
+        resp = await chat.chat_stream(chat.ChatRequest(question="날씨?", plan_mode=False), me)
+        return "".join([chunk async for chunk in resp.body_iterator])
+
+    events = _parse_sse(asyncio.run(run()))
+    names = [e for e, _ in events]
+
+    assert calls == [True]                               # 스트리밍 LLM 으로 에이전트 생성
+    assert names[0] == "conversation" and names[-1] == "done"
+    tokens = [d["delta"] for e, d in events if e == "token"]
+    assert len(tokens) > 1
+    assert names.index("done") > max(i for i, e in enumerate(names) if e == "token")
+    assert "".join(tokens) == ANSWER == events[-1][1]["answer"]
@@ -0,0 +1,60 @@
+# tests/test_conversation_detail.py
+"""대화 상세 조회의 SQL 문 수가 메시지 수와 무관하게 일정한지 (N+1 회귀 방지)"""
+import pytest
+from sqlalchemy import event
+
+import models
+from routers.chat import get_conversation_detail
+
+
+def _seed(db, n_messages: int):
+    user = models.User(username=f"u{n_messages}", password="x")
+    db.add(user); db.flush()
+    convo = models.Conversation(user_id=user.id, title="t")
+    db.add(convo); db.flush()
+    for i in range(n_messages):
+        msg = models.Message(conversation_id=convo.id, role="assistant", content=f"m{i}")
+        db.add(msg); db.flush()
+        card = models.RecCard(id=f"content_{n_messages}_{i}", type="content",
+                              title=f"card {i}", subtitle="", url="", tags=["a"])
+        db.add(card)
+        db.add(models.MessageRecommendationMap(message_id=msg.id, rec_card_id=card.id, sort_order=0))
+        db.add(models.MessageImage(message_id=msg.id, prompt="p", thumb_key="k" * 64))
+        db.add(models.FeedbackLog(user_id=user.id, category="chat",
+                                  reference_id=f"message_{msg.id}", feedback_score=1))
+    db.commit()
+    return user, convo
+
+
+def _count_statements(db, fn) -> int:
+    statements = []
+
+    def _on_execute(conn, cursor, statement, params, context, executemany):
+        statements.append(statement)
+
+    engine = db.get_bind()
+    event.listen(engine, "before_cursor_execute", _on_execute)
+    try:
+        fn()
+    finally:
+        event.remove(engine, "before_cursor_execute", _on_execute)
+    return len(statements)
+
+
+@pytest.mark.parametrize("limit", [None, 50])
+def test_detail_query_count_does_not_grow_with_messages(db, limit):
+    counts = {}
+    for n in (2, 20):
+        user, convo = _seed(db, n)
+        db.expire_all()     # 앞 단계에서 세션에 올라온 객체 재사용 방지
+        result = {}
+
+        def load():
+            result.update(get_conversation_detail(convo.id, limit=limit, before=None,
+                                                  db=db, current_user=user))
+
+        counts[n] = _count_statements(db, load)
+        assert len(result["messages"]) == n
+        assert all(m["cards"] and m["images"] and m["feedback"] for m in result["messages"])
+
+    assert counts[2] == counts[20]
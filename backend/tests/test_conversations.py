@@ -0,0 +1,46 @@
+# tests/test_conversations.py
+"""대화 목록 정렬/키셋 페이지네이션"""
+import datetime as dt
+import pytest
+from fastapi import Response
+
+import models
+from routers.chat import get_conversations
+
+
+@pytest.fixture
+def user_with_convos(db):
+    user = models.User(username="u", password="x")
+    db.add(user); db.flush()
+    # server_default(CURRENT_TIMESTAMP) 는 sqlite 에서 커서와 다른 문자열 형식이라 직접 지정
+    # 같은 시각 2개 → id 로 순서가 갈리는 경우도 포함
+    base = dt.datetime(2024, 1, 1)
+    convos = [models.Conversation(user_id=user.id, title=f"c{i}", created_at=base + dt.timedelta(minutes=i // 2))
+              for i in range(5)]
+    db.add_all(convos); db.commit()
+    return user, [c.id for c in convos]
+
+
+def _list(db, user, **params):
+    response = Response()
+    rows = get_conversations(response, limit=params.get("limit"), cursor=params.get("cursor"),
+                             order=params.get("order", "asc"), db=db, current_user=user)
+    return [r["conversation_id"] for r in rows], response.headers.get("X-Next-Cursor")
+
+
+def test_default_order_is_oldest_first(db, user_with_convos):
+    user, ids = user_with_convos
+    assert _list(db, user)[0] == ids
+    assert _list(db, user, order="desc")[0] == ids[::-1]
+
+
+@pytest.mark.parametrize("order", ["asc", "desc"])
+def test_cursor_pages_cover_everything_once(db, user_with_convos, order):
+    user, ids = user_with_convos
+    seen, cursor = [], None
+    while True:
+        page, cursor = _list(db, user, limit=2, cursor=cursor, order=order)
+        seen += page
+        if not cursor:
+            break
+    assert seen == (ids if order == "asc" else ids[::-1])
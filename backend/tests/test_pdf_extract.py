@@ -0,0 +1,93 @@
+# tests/test_pdf_extract.py
+"""PDF 추출 프로세스 풀 — 시간 초과 후 워커 정리/다음 추출"""
+import asyncio
+
+import pytest
+
+import utils.pdf_extract as pdf_extract
+
+
+def _write_pdf(path, pages: list[str]):
+    """텍스트 한 줄짜리 페이지들로 최소 PDF 작성"""
+    n = len(pages)
+    objs = [b"<< /Type /Catalog /Pages 2 0 R >>",
+            ("<< /Type /Pages /Kids [%s] /Count %d >>"
+             % (" ".join(f"{4 + 2 * i} 0 R" for i in range(n)), n)).encode(),
+            b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    for i, text in enumerate(pages):
+        stream = f"BT /F1 12 Tf 72 720 Td ({text}) Tj ET".encode()
+        objs.append((f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+                     f"/Resources << /Font << /F1 3 0 R >> >> /Contents {5 + 2 * i} 0 R >>").encode())
+        objs.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for i, body in enumerate(objs, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (i, body)
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objs) + 1)
+    out += b"".join(b"%010d 00000 n \n" % o for o in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objs) + 1, xref)
+    path.write_bytes(bytes(out))
+
+
+async def _collect(path, timeout: float | None = None) -> list[str]:
+    return [text async for text in pdf_extract.iter_pdf_pages(str(path), timeout=timeout)]
+
+
+@pytest.fixture
+def pdf_path(tmp_path):
+    path = tmp_path / "doc.pdf"
+    _write_pdf(path, [f"page {i}" for i in range(3)])
+    return path
+
+
+@pytest.fixture
+def closed_workers(monkeypatch):
+    """_close_pool 이 정리한 (terminate 여부, 워커 프로세스 목록) 기록"""
+    closed = []
+    original = pdf_extract._close_pool
+
+    def record(pool, terminate=False):
+        closed.append((terminate, list((pool._processes or {}).values())))
+        original(pool, terminate=terminate)
+
+    monkeypatch.setattr(pdf_extract, "_close_pool", record)
+    return closed
+
+
+def test_extracts_pages_in_order(pdf_path, closed_workers):
+    assert asyncio.run(_collect(pdf_path)) == ["page 0", "page 1", "page 2"]
+    assert [terminate for terminate, _ in closed_workers] == [False]
+    assert not pdf_extract._active
+
+
+def test_timeout_terminates_its_workers_and_next_extraction_succeeds(pdf_path, closed_workers):
+    with pytest.raises(pdf_extract.PdfExtractError, match="timed out"):
+        asyncio.run(_collect(pdf_path, timeout=1e-6))
+    terminate, procs = closed_workers[0]
+    assert terminate
+    for proc in procs:
+        proc.join(timeout=10)
+        assert not proc.is_alive()
+
+    assert asyncio.run(_collect(pdf_path)) == ["page 0", "page 1", "page 2"]
+
+
+def test_timeout_does_not_affect_concurrent_extraction(tmp_path):
+    slow = tmp_path / "slow.pdf"
+    _write_pdf(slow, [f"slow {i}" for i in range(3)])
+    big = tmp_path / "big.pdf"
+    pages = [f"big {i}" for i in range(pdf_extract.PDF_PAGES_PER_TASK * 3)]
+    _write_pdf(big, pages)
+
+    async def run():
+        got = []
+        it = pdf_extract.iter_pdf_pages(str(big))
+        got.append(await it.__anext__())        # big 의 워커가 실제로 돌고 있는 중에
+        with pytest.raises(pdf_extract.PdfExtractError, match="timed out"):
+            await _collect(slow, timeout=1e-6)  # 다른 추출이 시간 초과 → 그 워커만 종료
+        got += [text async for text in it]
+        return got
+
+    assert asyncio.run(run()) == pages
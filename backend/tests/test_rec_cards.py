@@ -0,0 +1,42 @@
+# tests/test_rec_cards.py
+"""RecCard upsert 문 — Postgres 방언으로 컴파일해서 확인"""
+from sqlalchemy.dialects import postgresql
+
+from utils.rec_cards import upsert_rec_cards
+
+
+class _CaptureSession:
+    def __init__(self):
+        self.statements = []
+
+    def execute(self, stmt):
+        self.statements.append(stmt)
+
+
+def _row(card_id: str, title: str = "t") -> dict:
+    return dict(id=card_id, type="content", title=title, subtitle="", url="", reason="", tags=[])
+
+
+def test_rows_are_deduped_and_inserted_in_id_order():
+    db = _CaptureSession()
+    n = upsert_rec_cards(db, [_row("c_3"), _row("c_1", "old"), _row("c_2"), _row("c_1", "new")])
+    assert n == 3
+    params = db.statements[0].compile(dialect=postgresql.dialect()).params
+    ids = [params[f"id_m{i}"] for i in range(3)]
+    assert ids == ["c_1", "c_2", "c_3"]
+    assert params["title_m0"] == "new"
+
+
+def test_empty_rows_execute_nothing():
+    db = _CaptureSession()
+    assert upsert_rec_cards(db, []) == 0
+    assert db.statements == []
+
+
+def test_update_bumps_refreshed_at_not_created_at():
+    db = _CaptureSession()
+    upsert_rec_cards(db, [_row("c_1")])
+    sql = str(db.statements[0].compile(dialect=postgresql.dialect()))
+    on_conflict = sql.split("ON CONFLICT", 1)[1]
+    assert "refreshed_at = now()" in on_conflict
+    assert "created_at" not in on_conflict
@@ -0,0 +1,128 @@
+# tests/test_recommend_sources.py
+"""추천 소스 갱신 실패가 소스 캐시에 FRESH 로 남지 않는지"""
+import time
+import datetime as dt
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import routers.recommend as rec
+from utils.source_cache import SourceCache, MISS, FRESH
+
+
+class _Resp:
+    status_code = 500
+    text = "boom"
+
+
+@pytest.fixture
+def pool():
+    with ThreadPoolExecutor(max_workers=1) as p:
+        yield p
+
+
+def _refresh(pool, rec_type: str, raises=rec.SourceRefreshError) -> str:
+    cache = SourceCache(soft_ttl=600, hard_ttl=3600)
+    key = (rec_type, "q", "ko-KR")
+    fut = cache.refresh(key, pool, rec._refresh_source, rec_type, "q", dt.timezone.utc)
+    if raises is None:
+        fut.result()
+    else:
+        with pytest.raises(raises):
+            fut.result()
+    pool.submit(lambda: None).result()     # 워커 1개 → 앞 작업의 done 콜백까지 끝남
+    return cache.lookup(key)
+
+
+def test_empty_cse_result_is_marked_fresh(monkeypatch, pool):
+    # 결과 0건은 정상 응답 → soft TTL 동안 CSE 재호출(과금) 없음
+    monkeypatch.setattr(rec, "google_search_cse", lambda **kw: [])
+    assert _refresh(pool, "content", raises=None) == FRESH
+
+
+def test_cse_error_is_not_marked_fresh(monkeypatch, pool):
+    def boom(**kw):
+        raise RuntimeError("CSE 500")
+    monkeypatch.setattr(rec, "google_search_cse", boom)
+    assert _refresh(pool, "content", raises=RuntimeError) == MISS
+
+
+def test_tmdb_error_is_not_marked_fresh(monkeypatch, pool):
+    monkeypatch.setenv("TMDB_API_KEY", "k")
+    monkeypatch.setattr(rec.requests, "get", lambda *a, **kw: _Resp())
+    assert _refresh(pool, "movie") == MISS
+
+
+def test_llm_filter_failure_reports_incomplete(monkeypatch):
+    monkeypatch.setattr(rec, "_llm_filter_items", lambda *a, **kw: None)
+    items = [{"title": f"t{i}", "snippet": "", "link": f"https://example.com/llm-fail/{i}"} for i in range(8)]
+    kept, complete = rec.filter_chunks_concurrently([items], user_query="q", content_type="content")
+    assert len(kept) == 5       # 안전 조치 fallback 은 그대로
+    assert complete is False
+
+
+def test_successful_refresh_is_marked_fresh():
+    cache = SourceCache(soft_ttl=600, hard_ttl=3600)
+    with ThreadPoolExecutor(max_workers=1) as p:    # 종료 대기 → done 콜백까지 끝난 뒤 확인
+        cache.refresh("k", p, lambda: None)
+    assert cache.lookup("k") == FRESH
+
+
+# ── LLM 필터 묶음 대기 / 부분 성공 재시도 ─────────────────────────
+@pytest.fixture
+def one_worker_filter(monkeypatch):
+    """필터 풀을 워커 1개로 → 묶음들이 줄을 섬. 묶음 1개 처리 0.2초"""
+    monkeypatch.setattr(rec, "_filter_pool", ThreadPoolExecutor(max_workers=1))
+    monkeypatch.setattr(rec, "LLM_FILTER_GRACE", 0.1)
+
+    def slow_filter(chunk, **kw):
+        time.sleep(0.2)
+        return chunk, True
+    monkeypatch.setattr(rec, "filter_recent_content_with_llm", slow_filter)
+    yield
+    rec._filter_pool.shutdown(wait=True)
+
+
+def _chunks(n: int) -> list[list[dict]]:
+    return [[{"title": f"t{i}", "link": f"https://example.com/q/{i}"}] for i in range(n)]
+
+
+def test_queued_chunks_get_their_own_deadline(one_worker_filter):
+    # 4묶음 × 0.2초 = 0.8초 > 공통 마감(0.3 + 0.1) 이지만, 묶음마다 실행 시작부터 재므로 모두 통과
+    kept, complete = rec.filter_chunks_concurrently(_chunks(4), user_query="q",
+                                                    content_type="content", timeout=0.3)
+    assert len(kept) == 4
+    assert complete is True
+
+
+def test_chunks_that_never_start_are_incomplete(one_worker_filter, monkeypatch):
+    monkeypatch.setattr(rec, "LLM_FILTER_QUEUE_TIMEOUT", 0.1)
+    rec._filter_pool.submit(time.sleep, 0.5)        # 다른 요청 작업이 풀을 차지
+    kept, complete = rec.filter_chunks_concurrently(_chunks(1), user_query="q",
+                                                    content_type="content", timeout=0.3)
+    assert kept == []
+    assert complete is False
+
+
+class _NoopDb:
+    def commit(self):
+        pass
+
+
+def test_partial_refresh_retry_reuses_cse_results(monkeypatch):
+    items = [{"title": f"t{i}", "snippet": "", "link": f"https://example.com/retry/{i}"} for i in range(3)]
+    cse_calls = []
+    monkeypatch.setattr(rec, "google_search_cse", lambda **kw: cse_calls.append(kw) or list(items))
+    monkeypatch.setattr(rec, "upsert_rec_cards", lambda db, rows: len(rows))
+    outcomes = iter([False, True, True])
+    monkeypatch.setattr(rec, "filter_chunks_concurrently",
+                        lambda chunks, **kw: ([it for c in chunks for it in c], next(outcomes)))
+
+    def refresh():
+        return rec.search_cse_and_create_cards(_NoopDb(), "retry q", "content", user_query="retry q")
+
+    assert refresh() is False       # 부분 성공 → 검색 결과 보관
+    assert refresh() is True        # 재시도 → CSE 재호출(과금) 없음
+    assert len(cse_calls) == 1
+    assert refresh() is True        # 완전한 갱신 뒤에는 다음 갱신이 새로 검색
+    assert len(cse_calls) == 2
@@ -0,0 +1,55 @@
+# tests/test_search_cse.py
+"""google_search_cse 페이지 호출 — 로컬 CSE stub 서버 상대로"""
+import pytest
+
+import routers.search as search
+from cse_stub import CseStub
+
+
+@pytest.fixture
+def cse(monkeypatch):
+    stubs = []
+
+    def _start(**kw) -> CseStub:
+        stub = CseStub(**kw).start()
+        stubs.append(stub)
+        monkeypatch.setattr(search, "GOOGLE_CSE_URL", stub.url)
+        return stub
+
+    yield _start
+    for stub in stubs:
+        stub.stop()
+
+
+def test_full_first_page_fans_out_in_order(cse):
+    stub = cse(total=100)
+    items = search.google_search_cse("q", num=35)
+    assert [it["link"] for it in items] == [f"https://example.com/{i}" for i in range(1, 36)]
+    assert sorted(stub.requests) == [1, 11, 21, 31]
+
+
+def test_short_first_page_makes_a_single_call(cse):
+    stub = cse(total=4)
+    items = search.google_search_cse("q", num=50)
+    assert len(items) == 4
+    assert stub.requests == [1]
+
+
+def test_stops_at_first_short_page(cse):
+    stub = cse(total=15, fail_starts={31})
+    items = search.google_search_cse("q", num=40)
+    # 두 번째 페이지가 덜 찼으므로 세 번째 이후 결과(과 에러)는 무시
+    assert len(items) == 15
+    assert stub.requests[0] == 1
+
+
+def test_later_page_error_keeps_earlier_results(cse):
+    cse(total=100, fail_starts={21})
+    items = search.google_search_cse("q", num=40)
+    assert len(items) == 20
+
+
+def test_first_page_error_raises(cse):
+    cse(total=100, fail_starts={1})
+    with pytest.raises(Exception):
+        search.google_search_cse("q", num=5)
@@ -0,0 +1,48 @@
+# tests/test_uploads.py
+"""업로드 스트리밍 헬퍼 — 해시/크기 검사, 텍스트 블록 디코딩"""
+import asyncio, hashlib, tempfile
+
+import pytest
+from fastapi import UploadFile
+
+import utils.uploads as uploads
+from utils.uploads import hash_upload, iter_text_blocks, UploadTooLarge
+
+
+def _upload(data: bytes) -> UploadFile:
+    f = tempfile.SpooledTemporaryFile(max_size=1024)
+    f.write(data)
+    f.seek(0)
+    return UploadFile(file=f, filename="doc.txt")
+
+
+async def _blocks(file: UploadFile, block_chars: int) -> list[str]:
+    return [b async for b in iter_text_blocks(file, block_chars)]
+
+
+def test_text_blocks_decode_whole_upload_on_paragraph_boundaries(monkeypatch):
+    monkeypatch.setattr(uploads, "UPLOAD_CHUNK_SIZE", 1001)    # 3바이트 글자가 읽기 경계에 걸리도록
+    text = "\n\n".join(f"문단 {i} " + "가나다라" * 50 for i in range(40)) + "\n"
+    file = _upload(text.encode("utf-8"))
+    blocks = asyncio.run(_blocks(file, block_chars=500))
+
+    assert "".join(blocks) == text
+    assert len(blocks) > 1
+    assert all(b.endswith("\n\n") for b in blocks[:-1])     # 문단 경계에서만 자름
+    assert not file.file.closed                               # 원본 업로드는 열린 채로
+
+
+def test_text_blocks_ignore_invalid_bytes():
+    file = _upload("안녕".encode("utf-8") + b"\xff\xfe" + "하세요".encode("utf-8"))
+    assert "".join(asyncio.run(_blocks(file, block_chars=4))) == "안녕하세요"
+
+
+def test_hash_upload_rewinds_and_enforces_limit():
+    data = b"x" * 5000
+    file = _upload(data)
+    digest, size = asyncio.run(hash_upload(file, max_bytes=10_000))
+    assert (digest, size) == (hashlib.sha256(data).hexdigest(), 5000)
+    assert file.file.read() == data
+
+    with pytest.raises(UploadTooLarge):
+        asyncio.run(hash_upload(_upload(data), max_bytes=4096))
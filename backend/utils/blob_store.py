@@ -0,0 +1,48 @@
+# utils/blob_store.py
+import os, hashlib, tempfile
+
+BLOB_STORE_DIR = os.getenv("BLOB_STORE_DIR", os.path.join(os.path.dirname(os.path.dirname(__file__)), "blobs"))
+
+
+class LocalBlobStore:
+    """
+    내용 주소 기반(content-addressed) 로컬 파일시스템 blob 저장소 (개발/테스트용)
+    - key = SHA-256(hex) → 같은 바이트는 한 번만 저장
+    - 경로: <root>/<key[:2]>/<key[2:4]>/<key>
+    - key 가 곧 내용의 해시이므로 그대로 ETag 로 사용 가능
+    """
+    def __init__(self, root: str = BLOB_STORE_DIR):
+        self.root = root
+
+    def path(self, key: str) -> str:
+        if len(key) != 64 or not all(c in "0123456789abcdef" for c in key):
+            raise ValueError(f"invalid blob key: {key!r}")
+        return os.path.join(self.root, key[:2], key[2:4], key)
+
+    def exists(self, key: str) -> bool:
+        return os.path.exists(self.path(key))
+
+    def put(self, data: bytes) -> str:
+        key = hashlib.sha256(data).hexdigest()
+        dst = self.path(key)
+        if os.path.exists(dst):
+            return key
+        os.makedirs(os.path.dirname(dst), exist_ok=True)
+        # 임시 파일에 쓴 뒤 rename → 동시에 같은 blob 을 써도 반쯤 쓰인 파일이 보이지 않음
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(dst), prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, dst)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            raise
+        return key
+
+    def get(self, key: str) -> bytes:
+        with open(self.path(key), "rb") as f:
+            return f.read()
+
+
+blob_store = LocalBlobStore()
@@ -0,0 +1,69 @@
+# utils/jobs.py
+import queue, threading
+from typing import Callable, Hashable
+
+
+class BackgroundJobQueue:
+    """
+    프로세스 내 백그라운드 작업 큐 (워커 스레드 풀)
+    - 같은 key 가 이미 대기/실행 중이면 새로 넣지 않는다(coalesce)
+    - handler 가 예외를 던지면 지수 백오프로 max_retries 번까지 재시도
+    - handler 는 key 만 받으므로, DB 세션 등은 handler 안에서 새로 열어야 한다
+    """
+    def __init__(self, name: str, handler: Callable[[Hashable], None],
+                 workers: int = 2, max_retries: int = 3, retry_delay: float = 2.0):
+        self.name = name
+        self.handler = handler
+        self.workers = workers
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+
+        self._q: "queue.Queue[tuple[Hashable, int] | None]" = queue.Queue()
+        self._keys: set = set()          # 대기 + 실행 + 재시도 대기 중인 key
+        self._lock = threading.Lock()
+        self._threads: list[threading.Thread] = []
+
+    def start(self):
+        with self._lock:
+            if self._threads:
+                return
+            for i in range(self.workers):
+                t = threading.Thread(target=self._work, name=f"{self.name}-worker-{i}", daemon=True)
+                t.start()
+                self._threads.append(t)
+
+    def stop(self):
+        with self._lock:
+            threads, self._threads = self._threads, []
+        for _ in threads:
+            self._q.put(None)
+
+    def submit(self, key: Hashable) -> bool:
+        """작업 등록. 이미 같은 key 가 진행 중이면 False"""
+        self.start()
+        with self._lock:
+            if key in self._keys:
+                return False
+            self._keys.add(key)
+        self._q.put((key, 0))
+        return True
+
+    def _work(self):
+        while True:
+            item = self._q.get()
+            if item is None:
+                return
+            key, attempt = item
+            try:
+                self.handler(key)
+            except Exception as e:
+                if attempt < self.max_retries:
+                    delay = self.retry_delay * 2 ** attempt
+                    print(f"[{self.name}] job {key} failed ({e}); retry in {delay:.0f}s")
+                    timer = threading.Timer(delay, self._q.put, args=((key, attempt + 1),))
+                    timer.daemon = True
+                    timer.start()
+                    continue
+                print(f"[{self.name}] job {key} gave up after {attempt + 1} attempts: {e}")
+            with self._lock:
+                self._keys.discard(key)
@@ -0,0 +1,19 @@
+# utils/pagination.py
+import base64, json
+import datetime as dt
+
+
+def encode_cursor(created_at: dt.datetime, row_id: int) -> str:
+    """(created_at, id) → URL-safe 불투명 커서 문자열"""
+    raw = json.dumps([created_at.isoformat(), row_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[dt.datetime, int]:
+    """encode_cursor 의 역변환. 형식이 틀리면 ValueError"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        ts, row_id = json.loads(raw)
+        return dt.datetime.fromisoformat(ts), int(row_id)
+    except Exception as e:
+        raise ValueError(f"invalid cursor: {cursor!r}") from e
@@ -0,0 +1,154 @@
+# utils/pdf_extract.py
+"""
+PDF 텍스트 추출을 이벤트 루프 밖(별도 프로세스)에서 페이지 범위 단위로 병렬 실행
+- 파일 경로를 넘기므로 프로세스 간에 PDF 바이트를 복사하지 않음
+- PDF_MAX_BYTES / PDF_MAX_PAGES 초과 → PdfLimitError
+- 전체 PDF_EXTRACT_TIMEOUT 초 안에 끝나지 않으면 PdfExtractError (그 추출의 워커만 종료)
+- iter_pdf_pages() 는 앞쪽 범위가 끝나는 대로 페이지를 순서대로 내보냄 (요약 파이프라인에 바로 연결)
+"""
+import os, asyncio, functools, threading, multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import AsyncIterator
+import pdfplumber
+
+PDF_MAX_BYTES       = int(os.getenv("PDF_MAX_BYTES", str(30 * 1024 * 1024)))
+PDF_MAX_PAGES       = int(os.getenv("PDF_MAX_PAGES", "500"))
+PDF_EXTRACT_TIMEOUT = float(os.getenv("PDF_EXTRACT_TIMEOUT", "120"))   # 파일 1개 전체 추출 한도(초)
+PDF_EXTRACT_WORKERS = int(os.getenv("PDF_EXTRACT_WORKERS", "2"))       # 추출 1건당 워커 프로세스 수
+PDF_EXTRACT_MAX_JOBS = int(os.getenv("PDF_EXTRACT_MAX_JOBS", "2"))     # 동시에 진행하는 추출 수
+PDF_PAGES_PER_TASK  = int(os.getenv("PDF_PAGES_PER_TASK", "8"))
+
+
+class PdfLimitError(ValueError):
+    """크기/페이지 수 제한 초과"""
+
+
+class PdfExtractError(RuntimeError):
+    """PDF 를 읽지 못했거나 시간 초과"""
+
+
+# 추출 1건마다 전용 프로세스 풀 — 시간 초과된 추출의 워커만 죽여도 다른 업로드에 영향 없음
+# 프로세스 총량은 PDF_EXTRACT_MAX_JOBS × PDF_EXTRACT_WORKERS 로 제한
+_slots = threading.BoundedSemaphore(PDF_EXTRACT_MAX_JOBS)
+_active: set[ProcessPoolExecutor] = set()
+_active_lock = threading.Lock()
+
+
+@functools.lru_cache(maxsize=None)
+def _mp_context():
+    """
+    서버 프로세스에는 스레드가 많으므로 fork 대신 forkserver (pdfplumber 를 미리 import 해 둔
+    서버에서 fork → 추출마다 새 풀을 만들어도 워커 기동이 빠름). 없는 플랫폼은 spawn
+    """
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        ctx = multiprocessing.get_context("forkserver")
+        ctx.set_forkserver_preload([__name__])
+        return ctx
+    return multiprocessing.get_context("spawn")
+
+
+def _new_pool() -> ProcessPoolExecutor:
+    pool = ProcessPoolExecutor(max_workers=PDF_EXTRACT_WORKERS, mp_context=_mp_context())
+    with _active_lock:
+        _active.add(pool)
+    return pool
+
+
+def _close_pool(pool: ProcessPoolExecutor, terminate: bool = False):
+    """
+    풀 정리. terminate=True 면 실행 중인 워커 프로세스도 강제 종료
+    (시간 초과/중단된 추출이 워커를 계속 붙잡지 않도록 — 이 풀은 이 추출 전용)
+    """
+    with _active_lock:
+        _active.discard(pool)
+    # shutdown() 이 _processes 를 비우므로 먼저 잡아 둠 (3.10 에는 공개 API 없음)
+    procs = list((pool._processes or {}).values()) if terminate else []
+    pool.shutdown(wait=False, cancel_futures=True)
+    for proc in procs:
+        if proc.is_alive():
+            proc.terminate()
+
+
+def shutdown_pdf_pool():
+    """앱 종료 시 진행 중인 추출의 워커 프로세스 정리"""
+    with _active_lock:
+        pools = list(_active)
+    for pool in pools:
+        _close_pool(pool, terminate=True)
+
+
+# ── 워커 프로세스에서 실행되는 함수 ─────────────────────────────
+def _count_pages(path: str) -> int:
+    with pdfplumber.open(path) as pdf:
+        return len(pdf.pages)
+
+
+def _extract_range(path: str, start: int, end: int) -> list[str]:
+    """[start, end) 페이지 텍스트"""
+    out = []
+    with pdfplumber.open(path) as pdf:
+        for page in pdf.pages[start:end]:
+            out.append(page.extract_text() or "")
+            page.flush_cache()      # 페이지별 파싱 캐시 해제 → 워커 메모리 일정하게
+    return out
+
+
+# ── 이벤트 루프 쪽 API ─────────────────────────────────────────
+async def _acquire_slot(remaining) -> None:
+    """동시 추출 슬롯 대기 (남은 시간 안에 못 얻으면 TimeoutError)"""
+    while not _slots.acquire(blocking=False):
+        if remaining() <= 0:
+            raise asyncio.TimeoutError
+        await asyncio.sleep(0.05)
+
+
+async def iter_pdf_pages(path: str, timeout: float | None = None) -> AsyncIterator[str]:
+    """PDF 파일 경로 → 페이지 텍스트를 순서대로 (범위별 병렬 추출). timeout 기본값 PDF_EXTRACT_TIMEOUT"""
+    size = os.path.getsize(path)
+    if size > PDF_MAX_BYTES:
+        raise PdfLimitError(f"PDF is too large ({size} bytes > {PDF_MAX_BYTES})")
+
+    timeout = PDF_EXTRACT_TIMEOUT if timeout is None else timeout
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+
+    def _remaining() -> float:
+        return max(deadline - loop.time(), 0.0)
+
+    try:
+        await _acquire_slot(_remaining)
+    except asyncio.TimeoutError:
+        raise PdfExtractError(f"PDF extraction timed out after {timeout:g}s (waiting for a free slot)")
+
+    pool = _new_pool()
+    finished = False
+    futures: list[asyncio.Future] = []
+    try:
+        n_pages = await asyncio.wait_for(loop.run_in_executor(pool, _count_pages, path), _remaining())
+        if n_pages > PDF_MAX_PAGES:
+            raise PdfLimitError(f"PDF has too many pages ({n_pages} > {PDF_MAX_PAGES})")
+        print(f"[PDF] {n_pages} pages, {size} bytes → {PDF_EXTRACT_WORKERS} workers")
+
+        futures = [
+            loop.run_in_executor(pool, _extract_range, path, s, min(s + PDF_PAGES_PER_TASK, n_pages))
+            for s in range(0, n_pages, PDF_PAGES_PER_TASK)
+        ]
+        for fut in futures:
+            for text in await asyncio.wait_for(asyncio.shield(fut), _remaining()):
+                yield text
+        finished = True
+    except asyncio.TimeoutError:
+        raise PdfExtractError(f"PDF extraction timed out after {timeout:g}s")
+    except BrokenProcessPool as e:
+        raise PdfExtractError(f"PDF worker crashed: {e}")
+    except PdfLimitError:
+        raise
+    except Exception as e:
+        raise PdfExtractError(str(e))
+    finally:
+        # 남은 범위 취소 — 시간 초과/오류/요약 쪽 중단이면 이 추출 전용 워커를 종료
+        for fut in futures:
+            fut.cancel()
+        _close_pool(pool, terminate=not finished)
+        _slots.release()
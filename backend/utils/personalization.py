@@ -1,47 +1,96 @@
 # utils/personalization.py
-import json, models
+import os, json, threading, models
 from sqlalchemy.orm import Session
+from utils.ttl_cache import TTLCache
+from utils.tokens import count_tokens
+
+# 사용자별 최근 피드백 요약 캐시 — /feedback upsert 시 invalidate_feedback() 로 비움
+FEEDBACK_CACHE_TTL  = float(os.getenv("FEEDBACK_CACHE_TTL", "300"))
+FEEDBACK_CACHE_SIZE = int(os.getenv("FEEDBACK_CACHE_SIZE", "4096"))
+_feedback_cache = TTLCache(maxsize=FEEDBACK_CACHE_SIZE, ttl=FEEDBACK_CACHE_TTL)
+
+
+def invalidate_feedback(user_id: int):
+    """해당 사용자의 피드백 요약 캐시 제거 (limit 별 항목 전부) + persona 버전 올림"""
+    _feedback_cache.pop_where(lambda k: k[0] == user_id)
+    bump_persona_version(user_id)
+
 
 def recent_feedback_summaries(db: Session, user: models.User, limit: int = 20):
     """
     최근 feedback N개를 {likes:[…], dislikes:[…]} 구조로 요약
     - 추천카드 → {id,title,tags}
     - 메시지   → {id,snippet}
+    피드백 1회 + 카드/메시지 IN 조회 각 1회 (결과는 사용자별 캐시, 읽기 전용으로 사용)
     """
-    rows = (db.query(models.FeedbackLog)
+    key = (user.id, limit)
+    cached = _feedback_cache.get(key)
+    if cached is not None:
+        return cached
+
+    rows = (db.query(models.FeedbackLog.category,
+                     models.FeedbackLog.reference_id,
+                     models.FeedbackLog.feedback_label)
               .filter(models.FeedbackLog.user_id == user.id,
                       models.FeedbackLog.feedback_label.in_(("like", "dislike")))
               .order_by(models.FeedbackLog.created_at.desc())
-              .limit(limit))
+              .limit(limit)
+              .all())
 
-    fb = {"likes": [], "dislikes": []}
+    # (0) 참조 id 파싱 → (bucket, 종류, id)
+    refs = []
+    for category, ref, label in rows:
+        bucket = "likes" if label == "like" else "dislikes"
+        if category == "recommend" and ref.startswith("card_id="):
+            refs.append((bucket, "card", ref.split("=", 1)[1]))
+        elif category == "chat" and ref.startswith("message_"):
+            try:
+                refs.append((bucket, "message", int(ref.split("_", 1)[1])))
+            except ValueError:
+                continue
+
+    card_ids = {rid for _, kind, rid in refs if kind == "card"}
+    msg_ids  = {rid for _, kind, rid in refs if kind == "message"}
+    cards = {
+        c.id: c for c in
+        db.query(models.RecCard.id, models.RecCard.title, models.RecCard.tags)
+          .filter(models.RecCard.id.in_(card_ids))
+    } if card_ids else {}
+    msgs = {
+        m.id: m for m in
+        db.query(models.Message.id, models.Message.content)
+          .filter(models.Message.id.in_(msg_ids))
+    } if msg_ids else {}
 
-    for r in rows:
-        bucket = "likes" if r.feedback_label == "like" else "dislikes"
+    fb = {"likes": [], "dislikes": []}
 
+    for bucket, kind, rid in refs:
         # (1) 추천카드
-        if r.category == "recommend" and r.reference_id.startswith("card_id="):
-            cid = r.reference_id.split("=")[1]
-            card = db.query(models.RecCard).filter_by(id=cid).first()
+        if kind == "card":
+            card = cards.get(rid)
             if card:
                 fb[bucket].append({
                     "id": card.id,
                     "title": card.title,
-                    "tags": card.tags[:5]
+                    "tags": (card.tags or [])[:5]
                 })
 
         # (2) 메시지
-        elif r.category == "chat" and r.reference_id.startswith("message_"):
-            mid = int(r.reference_id.split("_")[1])
-            msg = db.query(models.Message).filter_by(id=mid).first()
+        else:
+            msg = msgs.get(rid)
             if msg:
                 fb[bucket].append({
                     "id": msg.id,
                     "snippet": msg.content[:50]
                 })
 
+    _feedback_cache.put(key, fb)
     return fb
 
+def _dump(obj) -> str:
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+
 def make_persona_prompt(persona: dict) -> str:
     """
     persona(dict) → 자연어 요약 + RAW JSON 문자열
@@ -57,4 +106,135 @@ def make_persona_prompt(persona: dict) -> str:
         "최근 좋아요를 누른 카드/메시지를 우선 활용하고, "
         "싫어요를 누른 것은 피하세요.\n"
     )
-    return plain + "PERSONA_JSON=" + json.dumps(persona, ensure_ascii=False)
+    return plain + "PERSONA_JSON=" + _dump(persona)
+
+
+# persona prompt 토큰 예산 (system 메시지 전체 기준, tiktoken 으로 측정)
+PERSONA_TOKEN_BUDGET  = int(os.getenv("PERSONA_TOKEN_BUDGET", "400"))
+PERSONA_TOKEN_MODEL   = "gpt-3.5-turbo"
+_FEEDBACK_RECENCY_DECAY = 0.9    # 최근 피드백 n번째 항목 우선순위 = 0.9^n
+_DISLIKE_PRIORITY       = 0.8    # 싫어요는 좋아요보다 약간 뒤로
+
+
+def _persona_facts(persona: dict) -> list[tuple[float, str, int, object]]:
+    """
+    persona → (우선순위, 구역, 원래 순서, 값) 목록
+    - 장르   : 점수(1~5)/5
+    - 태그   : weight / 최대 weight
+    - 피드백 : 최근일수록 높음 (좋아요 > 싫어요)
+    """
+    facts = []
+    for i, (g, score) in enumerate(persona.get("genres", {}).items()):
+        facts.append(((score or 0) / 5, "genres", i, (g, score)))
+
+    tags = persona.get("tags", [])
+    max_w = max((abs(t.get("weight") or 0) for t in tags), default=0) or 1.0
+    for i, t in enumerate(tags):
+        facts.append(((t.get("weight") or 0) / max_w, "tags", i, t))
+
+    fb = persona.get("recent_feedback", {})
+    for bucket, base in (("likes", 1.0), ("dislikes", _DISLIKE_PRIORITY)):
+        for i, item in enumerate(fb.get(bucket, [])):
+            facts.append((base * _FEEDBACK_RECENCY_DECAY ** i, bucket, i, item))
+    return facts
+
+
+def compact_persona(persona: dict, token_budget: int) -> dict:
+    """
+    우선순위(weight·최신성) 높은 사실부터 token_budget 안에 들어가는 만큼만 담은 persona
+    (구역 안 순서는 원래 순서 유지)
+    """
+    out = {"locale": persona.get("locale", "ko"), "genres": {}, "tags": [],
+           "recent_feedback": {"likes": [], "dislikes": []}}
+    used = count_tokens(_dump(out), PERSONA_TOKEN_MODEL)
+
+    chosen: dict[str, list[tuple[int, object]]] = {"genres": [], "tags": [], "likes": [], "dislikes": []}
+    for prio, section, idx, value in sorted(_persona_facts(persona), key=lambda f: -f[0]):
+        cost = count_tokens(_dump(value), PERSONA_TOKEN_MODEL) + 1   # 구분자 몫
+        if used + cost > token_budget:
+            continue        # 더 작은 사실은 아직 들어갈 수 있으니 계속
+        used += cost
+        chosen[section].append((idx, value))
+
+    out["genres"] = dict(v for _, v in sorted(chosen["genres"], key=lambda x: x[0]))
+    out["tags"] = [v for _, v in sorted(chosen["tags"], key=lambda x: x[0])]
+    for bucket in ("likes", "dislikes"):
+        out["recent_feedback"][bucket] = [v for _, v in sorted(chosen[bucket], key=lambda x: x[0])]
+    return out
+
+
+def render_persona_prompt(persona: dict, token_budget: int = PERSONA_TOKEN_BUDGET) -> tuple[str, dict]:
+    """
+    token_budget 안으로 줄인 persona prompt + 토큰 통계 {full, compact, saved}
+    자연어 요약은 전체 persona 기준, JSON 부분만 예산에 맞춰 줄인다.
+    """
+    full = make_persona_prompt(persona)
+    full_tokens = count_tokens(full, PERSONA_TOKEN_MODEL)
+    if full_tokens <= token_budget:
+        prompt, compact_tokens = full, full_tokens
+    else:
+        head = full[:full.index("PERSONA_JSON=")]
+        json_budget = token_budget - count_tokens(head + "PERSONA_JSON=", PERSONA_TOKEN_MODEL)
+        prompt = head + "PERSONA_JSON=" + _dump(compact_persona(persona, max(json_budget, 0)))
+        compact_tokens = count_tokens(prompt, PERSONA_TOKEN_MODEL)
+
+    stats = {"full": full_tokens, "compact": compact_tokens, "saved": full_tokens - compact_tokens}
+    print(f"[PERSONA] tokens full={stats['full']} compact={stats['compact']} saved={stats['saved']}")
+    return prompt, stats
+
+
+# ───────────────────────────── persona 스냅샷 캐시 ─────────────────────────────
+# 사용자별 persona 버전 — 프로필/선호 태그/피드백이 바뀌면 올라가고,
+# 스냅샷은 만들 때의 버전과 현재 버전이 같을 때만 재사용한다.
+# (프로세스 내 메모리라 다른 워커의 변경은 PERSONA_CACHE_TTL 안에 반영)
+PERSONA_CACHE_TTL  = float(os.getenv("PERSONA_CACHE_TTL", "600"))
+PERSONA_CACHE_SIZE = int(os.getenv("PERSONA_CACHE_SIZE", "4096"))
+PERSONA_FEEDBACK_LIMIT = 50
+_persona_cache = TTLCache(maxsize=PERSONA_CACHE_SIZE, ttl=PERSONA_CACHE_TTL)
+_persona_versions: dict[int, int] = {}
+_persona_lock = threading.Lock()
+
+
+def bump_persona_version(user_id: int) -> int:
+    """프로필·선호·피드백 변경 시 호출 → 기존 스냅샷 무효화"""
+    with _persona_lock:
+        v = _persona_versions.get(user_id, 0) + 1
+        _persona_versions[user_id] = v
+    _persona_cache.pop(user_id)
+    return v
+
+
+def build_persona(db: Session, user: models.User) -> dict:
+    """유저 프로필 & 선호 & 피드백 취합 → persona dict (컬럼만 조회, 관계 lazy load 없음)"""
+    locale = (db.query(models.UserProfile.locale)
+                .filter(models.UserProfile.user_id == user.id)
+                .scalar())
+    genres = (db.query(models.UserPrefGenre.genre, models.UserPrefGenre.score)
+                .filter(models.UserPrefGenre.user_id == user.id))
+    tags = (db.query(models.UserPrefTag.tag_type, models.UserPrefTag.tag, models.UserPrefTag.weight)
+              .filter(models.UserPrefTag.user_id == user.id))
+    return {
+        "locale": locale or "ko",
+        "genres": {g: s for g, s in genres},
+        "tags":   [{"type": tt, "tag": t, "weight": w} for tt, t, w in tags],
+        "recent_feedback": recent_feedback_summaries(db, user, PERSONA_FEEDBACK_LIMIT)
+    }
+
+
+def get_persona_snapshot(db: Session, user: models.User) -> dict:
+    """
+    {version, persona, prompt, tokens} — prompt 는 PERSONA_TOKEN_BUDGET 안으로 줄여 미리 렌더링
+    (tokens = {full, compact, saved} 토큰 통계)
+    같은 버전이면 캐시된 스냅샷을 그대로 반환 (읽기 전용으로 사용)
+    """
+    with _persona_lock:
+        version = _persona_versions.get(user.id, 0)
+    snap = _persona_cache.get(user.id)
+    if snap is not None and snap["version"] == version:
+        return snap
+
+    persona = build_persona(db, user)
+    prompt, tokens = render_persona_prompt(persona)
+    snap = {"version": version, "persona": persona, "prompt": prompt, "tokens": tokens}
+    _persona_cache.put(user.id, snap)
+    return snap
@@ -0,0 +1,70 @@
+# utils/rec_cards.py
+import hashlib
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+import models
+
+# 추적용 쿼리 파라미터 → 같은 문서로 취급
+_TRACKING_PARAMS = {"fbclid", "gclid", "igshid", "mc_cid", "mc_eid", "ref", "ref_src"}
+
+
+def canonical_url(url: str) -> str:
+    """스킴/호스트 소문자, fragment·utm_* 등 추적 파라미터 제거, 끝 슬래시 정리"""
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    query = urlencode(sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not k.lower().startswith("utm_") and k.lower() not in _TRACKING_PARAMS
+    ))
+    path = parts.path.rstrip("/") or "/"
+    return urlunsplit((parts.scheme.lower() or "https", host, path, query, ""))
+
+
+def card_id_for_tmdb(rec_type: str, movie_id) -> str:
+    """TMDB 영화 id 기반 카드 id (예: movie_tmdb_12345)"""
+    return f"{rec_type}_tmdb_{movie_id}"
+
+
+def card_id_for_url(rec_type: str, url: str) -> str:
+    """정규화 URL 해시 기반 카드 id (예: content_3f2a…)"""
+    digest = hashlib.sha1(canonical_url(url).encode()).hexdigest()[:16]
+    return f"{rec_type}_{digest}"
+
+
+def upsert_rec_cards(db: Session, rows: list[dict], update: bool = True) -> int:
+    """
+    RecCard 행들을 INSERT ... ON CONFLICT (id) 한 번으로 저장 (commit 은 호출 측)
+    - update=True  : 이미 있으면 내용 갱신 + refreshed_at 을 지금으로 (최신 후보로 다시 올라오게)
+                     created_at 은 처음 생성 시각 그대로 — 최신성 특징이 학습/서빙에서 같은 값을 보도록
+    - update=False : 이미 있으면 그대로 둠
+    같은 id 가 한 배치에 여러 번 있으면 마지막 것만 사용
+    행은 id 순으로 정렬해서 넣음 → 겹치는 카드를 동시에 upsert 하는 트랜잭션들이 행 잠금을
+    같은 순서로 잡으므로 서로 기다리다 교착(deadlock)되지 않음
+    """
+    by_id = {r["id"]: r for r in rows}
+    if not by_id:
+        return 0
+    stmt = pg_insert(models.RecCard.__table__).values([by_id[k] for k in sorted(by_id)])
+    if update:
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["id"],
+            set_={
+                "type":       stmt.excluded.type,
+                "title":      stmt.excluded.title,
+                "subtitle":   stmt.excluded.subtitle,
+                "url":        stmt.excluded.url,
+                "reason":     stmt.excluded.reason,
+                "tags":       stmt.excluded.tags,
+                "refreshed_at": func.now(),
+            },
+        )
+    else:
+        stmt = stmt.on_conflict_do_nothing(index_elements=["id"])
+    db.execute(stmt)
+    return len(by_id)
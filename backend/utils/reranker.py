@@ -0,0 +1,292 @@
+# utils/reranker.py
+"""
+rec_impressions / feedback_logs 로 학습하는 경량 재정렬(re-rank) 모델 (NumPy 로지스틱 회귀)
+
+학습 (backend 디렉터리에서):
+    python -m utils.reranker [--epochs 800] [--l2 0.001] [--min-samples 50]
+→ RERANKER_DIR/reranker-<version>.json 저장 + RERANKER_DIR/ACTIVE 가 새 버전을 가리킴
+
+서빙: get_reranker() 가 ACTIVE 버전을 프로세스당 한 번 읽어 두고,
+      /recommend 가 후보 전체에 대해 logit 을 배치로 계산해 규칙 점수에 더한다.
+
+라벨 : clicked/accepted 노출, 좋아요 → 1 / dismissed 노출, 싫어요 → 0
+       (사용자·카드 쌍마다 가장 최근 라벨 사용)
+특징 : 태그 선호도, 최신성, 이전 노출(viewed) 수, 태그 수, 카드 type
+       — 라벨로 쓰이는 좋아요/싫어요/dismissed 는 특징에 넣지 않음 (누수 방지)
+"""
+import os, json, math, argparse, threading
+import datetime as dt
+from collections import defaultdict
+from typing import Sequence
+import numpy as np
+
+from utils.scoring import tag_affinity, recency
+
+RERANKER_DIR = os.getenv("RERANKER_DIR", os.path.join(os.path.dirname(os.path.dirname(__file__)), "reranker_models"))
+ACTIVE_FILE  = "ACTIVE"
+
+FEATURES = [
+    "tag_affinity", "tag_matches", "recency", "log_viewed", "n_tags",
+    "type_movie", "type_content", "type_learn",
+]
+_TYPES = ("movie", "content", "learn")
+
+POSITIVE_ACTIONS = {"clicked", "accepted"}
+NEGATIVE_ACTIONS = {"dismissed"}
+
+
+def build_features(
+    card_types: Sequence[str | None],
+    card_tags: Sequence[Sequence[str] | None],
+    created_at: Sequence[dt.datetime | None],
+    tag_weights: dict[str, float],
+    viewed: Sequence[int],
+    now: dt.datetime | Sequence[dt.datetime],
+) -> np.ndarray:
+    """한 사용자 기준 카드 N개의 특징 행렬 (N × len(FEATURES)) — 학습/서빙 공용"""
+    if not len(card_tags):
+        return np.zeros((0, len(FEATURES)))
+    affinity, matches = tag_affinity(card_tags, tag_weights)
+    types = np.array([t or "" for t in card_types], dtype=object)
+    return np.column_stack([
+        affinity,
+        matches,
+        recency(created_at, now),
+        np.log1p(np.asarray(viewed, dtype=np.float64)),
+        np.array([len(t or ()) for t in card_tags], dtype=np.float64),
+        *[(types == t).astype(np.float64) for t in _TYPES],
+    ])
+
+
+def _sigmoid(z: np.ndarray) -> np.ndarray:
+    return 1.0 / (1.0 + np.exp(-np.clip(z, -30, 30)))
+
+
+class RerankerModel:
+    """표준화 + 로지스틱 회귀 가중치 (JSON artifact 한 개)"""
+    def __init__(self, artifact: dict):
+        if artifact.get("features") != FEATURES:
+            raise ValueError(f"feature mismatch: {artifact.get('features')}")
+        self.artifact  = artifact
+        self.version   = artifact["version"]
+        self.mean      = np.asarray(artifact["mean"], dtype=np.float64)
+        self.std       = np.asarray(artifact["std"], dtype=np.float64)
+        self.coef      = np.asarray(artifact["coef"], dtype=np.float64)
+        self.intercept = float(artifact["intercept"])
+
+    @classmethod
+    def load(cls, path: str) -> "RerankerModel":
+        with open(path, encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def logit(self, X: np.ndarray) -> np.ndarray:
+        return ((X - self.mean) / self.std) @ self.coef + self.intercept
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        return _sigmoid(self.logit(X))
+
+    def info(self) -> dict:
+        a = self.artifact
+        return {k: a.get(k) for k in ("version", "trained_at", "n_samples", "n_positive", "metrics")}
+
+
+# ───────────────────────────── 서빙 (프로세스당 1회 로드) ─────────────────────────────
+_model: RerankerModel | None = None
+_loaded = False
+_load_lock = threading.Lock()
+
+
+def get_reranker() -> RerankerModel | None:
+    """ACTIVE 버전 모델 (없거나 읽기 실패 → None, 규칙 점수만 사용)"""
+    global _model, _loaded
+    if _loaded:
+        return _model
+    with _load_lock:
+        if not _loaded:
+            try:
+                with open(os.path.join(RERANKER_DIR, ACTIVE_FILE), encoding="utf-8") as f:
+                    name = f.read().strip()
+                _model = RerankerModel.load(os.path.join(RERANKER_DIR, name))
+                print(f"[RERANKER] loaded {_model.version}")
+            except FileNotFoundError:
+                _model = None
+            except Exception as e:
+                print(f"[RERANKER] load failed: {e}")
+                _model = None
+            _loaded = True
+    return _model
+
+
+# ───────────────────────────── 학습 ─────────────────────────────
+def collect_training_data(db) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    DB 에서 벌크 조회 → (X, y, 이벤트 시각[epoch 초])
+    테이블마다 쿼리 1회 (행 단위 추가 조회 없음)
+    """
+    import models
+
+    # (1) 라벨 이벤트 : (user, card) → (시각, label) 중 가장 최근 것
+    labels: dict[tuple[int, str], tuple[dt.datetime, int]] = {}
+    viewed_at: dict[tuple[int, str], list[dt.datetime]] = defaultdict(list)
+
+    def _label(key, at, y):
+        if at is None:
+            return
+        if key not in labels or labels[key][0] < at:
+            labels[key] = (at, y)
+
+    for user_id, card_id, action, shown_at in db.query(
+        models.RecImpression.user_id, models.RecImpression.card_id,
+        models.RecImpression.action, models.RecImpression.shown_at,
+    ):
+        key = (user_id, card_id)
+        if action in POSITIVE_ACTIONS:
+            _label(key, shown_at, 1)
+        elif action in NEGATIVE_ACTIONS:
+            _label(key, shown_at, 0)
+        elif action == "viewed" and shown_at is not None:
+            viewed_at[key].append(shown_at)
+
+    for user_id, ref, label, created_at in (
+        db.query(models.FeedbackLog.user_id, models.FeedbackLog.reference_id,
+                 models.FeedbackLog.feedback_label, models.FeedbackLog.created_at)
+          .filter(models.FeedbackLog.category == "recommend",
+                  models.FeedbackLog.feedback_label.in_(("like", "dislike")))
+    ):
+        if ref and ref.startswith("card_id="):
+            _label((user_id, ref.split("=", 1)[1]), created_at, 1 if label == "like" else 0)
+
+    if not labels:
+        return np.zeros((0, len(FEATURES))), np.zeros(0), np.zeros(0)
+
+    # (2) 카드 / 사용자 태그 weight
+    #     created_at 은 upsert 로 갱신되지 않는 최초 생성 시각 → 이벤트 당시 서빙 때와 같은 최신성 값
+    card_ids = {cid for _, cid in labels}
+    cards = {
+        c.id: c for c in
+        db.query(models.RecCard.id, models.RecCard.type, models.RecCard.tags, models.RecCard.created_at)
+          .filter(models.RecCard.id.in_(card_ids))
+    }
+    user_ids = {uid for uid, _ in labels}
+    weights: dict[int, dict[str, float]] = defaultdict(dict)
+    for uid, tag, w in (db.query(models.UserPrefTag.user_id, models.UserPrefTag.tag, models.UserPrefTag.weight)
+                          .filter(models.UserPrefTag.user_id.in_(user_ids))):
+        weights[uid][tag] = w or 0.0
+
+    # (3) 사용자별로 특징 계산 (이벤트 시점 이전 노출만 사용)
+    by_user: dict[int, list] = defaultdict(list)
+    for (uid, cid), (at, y) in labels.items():
+        if cid in cards:
+            by_user[uid].append((cid, at, y))
+
+    X_parts, y_all, t_all = [], [], []
+    for uid, rows in by_user.items():
+        rc = [cards[cid] for cid, _, _ in rows]
+        X_parts.append(build_features(
+            [c.type for c in rc], [c.tags for c in rc], [c.created_at for c in rc],
+            weights.get(uid, {}),
+            [sum(1 for v in viewed_at.get((uid, cid), ()) if v < at) for cid, at, _ in rows],
+            [at for _, at, _ in rows],
+        ))
+        y_all.extend(y for _, _, y in rows)
+        t_all.extend(at.timestamp() for _, at, _ in rows)
+
+    if not X_parts:
+        return np.zeros((0, len(FEATURES))), np.zeros(0), np.zeros(0)
+    return np.vstack(X_parts), np.asarray(y_all, dtype=np.float64), np.asarray(t_all)
+
+
+def fit_logistic(X: np.ndarray, y: np.ndarray, l2: float = 1e-3,
+                 epochs: int = 800, lr: float = 0.5) -> dict:
+    """표준화 후 L2 로지스틱 회귀 (full-batch gradient descent)"""
+    mean = X.mean(axis=0)
+    std = X.std(axis=0)
+    std[std == 0] = 1.0
+    Z = (X - mean) / std
+    pos = min(max(y.mean(), 1e-3), 1 - 1e-3)
+    w, b = np.zeros(X.shape[1]), math.log(pos / (1 - pos))
+    n = len(y)
+    for _ in range(epochs):
+        g = _sigmoid(Z @ w + b) - y
+        w -= lr * (Z.T @ g / n + l2 * w)
+        b -= lr * g.mean()
+    return {"mean": mean.tolist(), "std": std.tolist(), "coef": w.tolist(), "intercept": b}
+
+
+def _auc(y: np.ndarray, p: np.ndarray) -> float | None:
+    """Mann-Whitney 순위 기반 AUC (한 클래스만 있으면 None)"""
+    n_pos, n_neg = int(y.sum()), int(len(y) - y.sum())
+    if n_pos == 0 or n_neg == 0:
+        return None
+    ranks = np.empty(len(p))
+    ranks[np.argsort(p, kind="mergesort")] = np.arange(1, len(p) + 1)
+    return float((ranks[y == 1].sum() - n_pos * (n_pos + 1) / 2) / (n_pos * n_neg))
+
+
+def _logloss(y: np.ndarray, p: np.ndarray) -> float:
+    p = np.clip(p, 1e-7, 1 - 1e-7)
+    return float(-(y * np.log(p) + (1 - y) * np.log(1 - p)).mean())
+
+
+def train(db, out_dir: str = RERANKER_DIR, l2: float = 1e-3, epochs: int = 800,
+          min_samples: int = 50, holdout: float = 0.2) -> dict | None:
+    """
+    학습 → 검증(시간순 마지막 holdout 비율) → 전체로 재학습 → artifact 저장 + ACTIVE 갱신
+    샘플이 부족하거나 라벨이 한쪽뿐이면 저장하지 않고 None
+    """
+    X, y, t = collect_training_data(db)
+    print(f"[RERANKER] samples={len(y)} positive={int(y.sum())}")
+    if len(y) < min_samples or y.min() == y.max():
+        print("[RERANKER] not enough labelled data — skipped")
+        return None
+
+    order = np.argsort(t, kind="stable")
+    cut = int(len(order) * (1 - holdout))
+    metrics = {}
+    if 0 < cut < len(order):
+        tr, va = order[:cut], order[cut:]
+        m = RerankerModel({**fit_logistic(X[tr], y[tr], l2, epochs),
+                           "features": FEATURES, "version": "holdout"})
+        p = m.predict(X[va])
+        metrics = {"holdout_size": int(len(va)), "logloss": _logloss(y[va], p), "auc": _auc(y[va], p)}
+        print(f"[RERANKER] holdout {metrics}")
+
+    now = dt.datetime.utcnow()
+    version = f"lr-{now:%Y%m%d%H%M%S}"
+    artifact = {
+        "version": version,
+        "trained_at": now.isoformat() + "Z",
+        "features": FEATURES,
+        "n_samples": int(len(y)),
+        "n_positive": int(y.sum()),
+        "params": {"l2": l2, "epochs": epochs},
+        "metrics": metrics,
+        **fit_logistic(X, y, l2, epochs),
+    }
+
+    os.makedirs(out_dir, exist_ok=True)
+    name = f"reranker-{version}.json"
+    with open(os.path.join(out_dir, name), "w", encoding="utf-8") as f:
+        json.dump(artifact, f, ensure_ascii=False, indent=2)
+    tmp = os.path.join(out_dir, ACTIVE_FILE + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(name)
+    os.replace(tmp, os.path.join(out_dir, ACTIVE_FILE))      # 원자적으로 활성 버전 교체
+    print(f"[RERANKER] saved {name}")
+    return artifact
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="rec_impressions / feedback_logs 로 재정렬 모델 학습")
+    ap.add_argument("--out-dir", default=RERANKER_DIR)
+    ap.add_argument("--l2", type=float, default=1e-3)
+    ap.add_argument("--epochs", type=int, default=800)
+    ap.add_argument("--min-samples", type=int, default=50)
+    args = ap.parse_args()
+
+    from database import SessionLocal
+    db = SessionLocal()
+    try:
+        train(db, args.out_dir, l2=args.l2, epochs=args.epochs, min_samples=args.min_samples)
+    finally:
+        db.close()
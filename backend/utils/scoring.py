@@ -0,0 +1,96 @@
+# utils/scoring.py
+import os, math
+import datetime as dt
+from typing import Sequence
+import numpy as np
+
+# 개인화 점수 가중치
+SCORE_TAG_WEIGHT        = float(os.getenv("SCORE_TAG_WEIGHT", "0.5"))       # 선호 태그 weight 배율
+SCORE_RECENCY_WEIGHT    = float(os.getenv("SCORE_RECENCY_WEIGHT", "1.0"))   # 막 생성된 카드의 최신성 점수
+SCORE_RECENCY_HALF_LIFE = float(os.getenv("SCORE_RECENCY_HALF_LIFE", "7"))  # 최신성 반감기(일)
+SCORE_FEEDBACK_BONUS    = 3.0                                               # 좋아요 +, 싫어요 −
+SCORE_VIEWED_PENALTY    = float(os.getenv("SCORE_VIEWED_PENALTY", "0.2"))   # 노출 1회당 감점
+SCORE_VIEWED_MAX        = float(os.getenv("SCORE_VIEWED_MAX", "1.0"))       # 노출 감점 상한
+SCORE_DISMISS_PENALTY   = float(os.getenv("SCORE_DISMISS_PENALTY", "1.5"))  # dismissed 1회당 감점
+
+
+def tag_matrix(card_tags: Sequence[Sequence[str] | None]) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    카드별 태그 목록 → 희소 카드×태그 행렬 (COO 형태)
+    반환: (rows, cols, vocab)  rows[k] 번째 카드가 vocab[cols[k]] 태그를 가짐
+    """
+    lengths = np.fromiter((len(t or ()) for t in card_tags), dtype=np.int64, count=len(card_tags))
+    rows = np.repeat(np.arange(len(card_tags)), lengths)
+    flat = [tag for tags in card_tags for tag in (tags or ())]
+    if not flat:
+        return rows, np.zeros(0, dtype=np.int64), np.array([], dtype=str)
+    vocab, cols = np.unique(np.array(flat, dtype=str), return_inverse=True)
+    return rows, cols, vocab
+
+
+def tag_affinity(card_tags: Sequence[Sequence[str] | None],
+                 tag_weights: dict[str, float]) -> tuple[np.ndarray, np.ndarray]:
+    """카드별 (선호 태그 weight 합, 선호 태그와 겹치는 태그 수) — 카드×태그 행렬 · 사용자 weight 벡터"""
+    n = len(card_tags)
+    rows, cols, vocab = tag_matrix(card_tags)
+    user_vec = np.array([tag_weights.get(t, 0.0) for t in vocab], dtype=np.float64)
+    affinity = np.bincount(rows, weights=user_vec[cols], minlength=n)
+    matches = np.bincount(rows, weights=(user_vec != 0)[cols].astype(np.float64), minlength=n)
+    return affinity, matches
+
+
+def recency(created_at: Sequence[dt.datetime | None],
+            now: dt.datetime | Sequence[dt.datetime]) -> np.ndarray:
+    """반감기(SCORE_RECENCY_HALF_LIFE) 기준 지수 감쇠 0~1 (created_at 없음 → 0). now 는 카드별 기준 시각도 가능"""
+    nows = [now] * len(created_at) if isinstance(now, dt.datetime) else now
+    age_days = np.array(
+        [(t - c).total_seconds() / 86400 if c else np.inf for c, t in zip(created_at, nows)],
+        dtype=np.float64,
+    )
+    return np.exp(-math.log(2) * np.clip(age_days, 0, None) / SCORE_RECENCY_HALF_LIFE)
+
+
+def score_candidates(
+    ids: Sequence[str],
+    created_at: Sequence[dt.datetime | None],
+    card_tags: Sequence[Sequence[str] | None],
+    tag_weights: dict[str, float],
+    like_ids: set[str] = frozenset(),
+    dislike_ids: set[str] = frozenset(),
+    impressions: dict[tuple[str, str], int] | None = None,
+    now: dt.datetime | None = None,
+) -> np.ndarray:
+    """
+    후보 카드 N개의 개인화 점수를 한 번에 계산 (카드 순서대로 float 배열)
+      score = 태그 선호(카드×태그 행렬 · 사용자 weight 벡터) × SCORE_TAG_WEIGHT
+            + 최신성(지수 감쇠)
+            ± 좋아요/싫어요
+            − 노출/dismissed 감점
+    impressions: {(card_id, action): 횟수}
+    """
+    n = len(ids)
+    if n == 0:
+        return np.zeros(0)
+    ids_arr = np.array(ids, dtype=object)
+
+    # (1) 태그 선호 : 희소 행렬 × 사용자 weight 벡터
+    affinity, _ = tag_affinity(card_tags, tag_weights)
+    score = affinity * SCORE_TAG_WEIGHT
+
+    # (2) 최신성 : 반감기 기준 지수 감쇠 (created_at 없음 → 0)
+    score += SCORE_RECENCY_WEIGHT * recency(created_at, now or dt.datetime.utcnow())
+
+    # (3) 좋아요 / 싫어요
+    if like_ids:
+        score += SCORE_FEEDBACK_BONUS * np.isin(ids_arr, list(like_ids))
+    if dislike_ids:
+        score -= SCORE_FEEDBACK_BONUS * np.isin(ids_arr, list(dislike_ids))
+
+    # (4) 노출 감점 : 이미 여러 번 본 카드 / 치워버린 카드는 뒤로
+    if impressions:
+        viewed    = np.array([impressions.get((i, "viewed"), 0) for i in ids], dtype=np.float64)
+        dismissed = np.array([impressions.get((i, "dismissed"), 0) for i in ids], dtype=np.float64)
+        score -= np.minimum(viewed * SCORE_VIEWED_PENALTY, SCORE_VIEWED_MAX)
+        score -= dismissed * SCORE_DISMISS_PENALTY
+
+    return score
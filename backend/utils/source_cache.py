@@ -0,0 +1,59 @@
+# utils/source_cache.py
+import time, threading
+from collections import OrderedDict
+from concurrent.futures import Executor, Future
+from typing import Callable, Hashable
+
+FRESH, STALE, MISS = "fresh", "stale", "miss"
+
+
+class SourceCache:
+    """
+    추천 후보 소스(TMDB / CSE+LLM) 갱신 시각을 기억하는 stale-while-revalidate 캐시
+    - soft_ttl 이내   → FRESH : 외부 호출 없이 DB 의 기존 카드 사용
+    - hard_ttl 이내   → STALE : 기존 카드로 바로 응답하고 백그라운드에서 갱신
+    - 그 외 / 처음    → MISS  : 갱신을 기다려야 함
+    같은 키의 갱신은 한 번만 돌도록(in-flight Future 공유) 합친다.
+    """
+    def __init__(self, soft_ttl: float, hard_ttl: float, maxsize: int = 2048):
+        self.soft_ttl = soft_ttl
+        self.hard_ttl = hard_ttl
+        self.maxsize = maxsize
+        self._fetched: "OrderedDict[Hashable, float]" = OrderedDict()
+        self._inflight: dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+
+    def lookup(self, key: Hashable) -> str:
+        with self._lock:
+            at = self._fetched.get(key)
+        if at is None:
+            return MISS
+        age = time.monotonic() - at
+        if age < self.soft_ttl:
+            return FRESH
+        return STALE if age < self.hard_ttl else MISS
+
+    def refresh(self, key: Hashable, pool: Executor, fn: Callable, *args) -> Future:
+        """fn(*args) 로 갱신 (이미 진행 중이면 그 Future 를 돌려줌). 성공하면 갱신 시각 기록"""
+        with self._lock:
+            fut = self._inflight.get(key)
+            if fut is not None:
+                return fut
+            fut = pool.submit(fn, *args)
+            self._inflight[key] = fut
+        fut.add_done_callback(lambda f: self._done(key, f))
+        return fut
+
+    def _done(self, key: Hashable, fut: Future):
+        with self._lock:
+            self._inflight.pop(key, None)
+            if fut.cancelled() or fut.exception() is not None:
+                return
+            self._fetched[key] = time.monotonic()
+            self._fetched.move_to_end(key)
+            while len(self._fetched) > self.maxsize:
+                self._fetched.popitem(last=False)
+
+    def invalidate(self, key: Hashable):
+        with self._lock:
+            self._fetched.pop(key, None)
@@ -0,0 +1,242 @@
+# utils/summarize_pipeline.py
+"""
+대용량 문서 map-reduce 요약
+  1) 페이지/문단 경계로 토큰 예산(SUMMARY_CHUNK_TOKENS) 단위 chunk 분할
+  2) map   : chunk 별 부분 요약을 동시에 (SUMMARY_CONCURRENCY 개까지)
+  3) reduce: 부분 요약들을 토큰 예산 단위로 묶어 계층적으로 합침 → 최종 한국어 요약
+chunk 가 하나뿐이면 최종 프롬프트로 한 번만 호출 (기존 동작과 동일)
+"""
+import os, re, time, asyncio
+from typing import AsyncIterable, Awaitable, Callable, Iterable
+import httpx
+from openai import AsyncOpenAI
+
+from utils.tokens import count_tokens
+
+SUMMARY_MODEL          = "gpt-3.5-turbo"
+SUMMARY_PROMPT_VERSION = "mr-v1"     # 프롬프트/분할 방식이 바뀌면 올림 (요약 캐시 키에 사용)
+SUMMARY_CHUNK_TOKENS   = int(os.getenv("SUMMARY_CHUNK_TOKENS", "2500"))   # map 입력 chunk 토큰 예산
+SUMMARY_REDUCE_TOKENS  = int(os.getenv("SUMMARY_REDUCE_TOKENS", "3000"))  # reduce 1회 입력 토큰 예산
+SUMMARY_CONCURRENCY    = int(os.getenv("SUMMARY_CONCURRENCY", "4"))       # 동시 LLM 호출 상한
+SUMMARY_CALL_TIMEOUT   = float(os.getenv("SUMMARY_CALL_TIMEOUT", "60"))   # 호출당 타임아웃(초)
+# 요약 결과를 바꾸는 설정 전체 — 요약 캐시 키에 포함
+SUMMARY_VERSION = f"{SUMMARY_PROMPT_VERSION}:{SUMMARY_MODEL}:{SUMMARY_CHUNK_TOKENS}:{SUMMARY_REDUCE_TOKENS}"
+
+aclient = AsyncOpenAI(
+    api_key=os.getenv("OPENAI_API_KEY"),
+    http_client=httpx.AsyncClient(),     # proxies 파라미터 없음
+)
+
+FINAL_PROMPT = (
+    "You are a helpful assistant. The user has uploaded a document in an unknown language. "
+    "Your job is to provide a summary in Korean (regardless of the original document language). "
+    "Please keep it concise and clear in Korean."
+)
+MAP_PROMPT = (
+    "You are a helpful assistant. You will receive one part of a longer document in an unknown language. "
+    "Summarize this part in Korean as short bullet points, keeping key facts, numbers, names and conclusions. "
+    "Do not add an introduction or closing remarks."
+)
+REDUCE_PROMPT = (
+    "You are a helpful assistant. You will receive partial Korean summaries of consecutive parts of one document. "
+    "Merge them into a single Korean summary as bullet points, removing duplicates and keeping the original order."
+)
+FINAL_REDUCE_PROMPT = FINAL_PROMPT + (
+    " The input is a set of partial summaries of consecutive parts of the document, in order."
+)
+
+_PARA_RE = re.compile(r"\n\s*\n")
+
+
+def _tokens(text: str) -> int:
+    return count_tokens(text, SUMMARY_MODEL)
+
+
+def _split_oversized(text: str, budget: int) -> list[str]:
+    """예산보다 큰 문단 → 줄 단위로, 그래도 크면 글자 수 기준으로 자름"""
+    out, buf, used = [], [], 0
+    for line in text.split("\n"):
+        t = _tokens(line) + 1
+        if t > budget:
+            if buf:
+                out.append("\n".join(buf)); buf, used = [], 0
+            step = max(len(line) * budget // t, 1)
+            out.extend(line[i:i + step] for i in range(0, len(line), step))
+            continue
+        if used + t > budget and buf:
+            out.append("\n".join(buf)); buf, used = [], 0
+        buf.append(line); used += t
+    if buf:
+        out.append("\n".join(buf))
+    return out
+
+
+class TextChunker:
+    """
+    페이지를 하나씩 받아 토큰 예산 단위 chunk 를 만들어 냄 (문단/페이지 경계에서만 자름)
+      chunker.add_page(text) → 이번에 완성된 chunk 목록
+      chunker.flush()        → 남은 chunk
+    """
+    def __init__(self, budget: int = SUMMARY_CHUNK_TOKENS):
+        self.budget = budget
+        self._paras: list[str] = []
+        self._used = 0
+
+    def _emit(self) -> list[str]:
+        if not self._paras:
+            return []
+        chunk = "\n\n".join(self._paras)
+        self._paras, self._used = [], 0
+        return [chunk]
+
+    def add_page(self, text: str) -> list[str]:
+        ready = []
+        for para in _PARA_RE.split(text or ""):
+            para = para.strip()
+            if not para:
+                continue
+            t = _tokens(para) + 2
+            pieces = [para] if t <= self.budget else _split_oversized(para, self.budget)
+            for piece in pieces:
+                t = _tokens(piece) + 2
+                if self._used + t > self.budget:
+                    ready += self._emit()
+                self._paras.append(piece)
+                self._used += t
+        return ready
+
+    def flush(self) -> list[str]:
+        return self._emit()
+
+
+def split_pages(pages: Iterable[str], budget: int = SUMMARY_CHUNK_TOKENS) -> list[str]:
+    """페이지 목록 → chunk 목록"""
+    chunker = TextChunker(budget)
+    chunks = []
+    for page in pages:
+        chunks += chunker.add_page(page)
+    return chunks + chunker.flush()
+
+
+async def _complete(system: str, user: str, sem: asyncio.Semaphore) -> str:
+    async with sem:
+        rsp = await asyncio.wait_for(
+            aclient.chat.completions.create(
+                model=SUMMARY_MODEL,
+                messages=[{"role": "system", "content": system},
+                          {"role": "user", "content": user}],
+            ),
+            timeout=SUMMARY_CALL_TIMEOUT,
+        )
+    return rsp.choices[0].message.content or ""
+
+
+def _pack(parts: list[str], budget: int) -> list[list[str]]:
+    """부분 요약들을 순서대로 budget 토큰 이하 묶음으로 (묶음당 최소 2개)"""
+    groups, cur, used = [], [], 0
+    for p in parts:
+        t = _tokens(p) + 2
+        if cur and used + t > budget and len(cur) >= 2:
+            groups.append(cur); cur, used = [], 0
+        cur.append(p); used += t
+    if cur:
+        if len(cur) == 1 and groups:
+            groups[-1].append(cur[0])
+        else:
+            groups.append(cur)
+    return groups
+
+
+async def _reduce(parts: list[str], sem: asyncio.Semaphore) -> str:
+    """한 번에 들어가면 최종 요약, 아니면 묶음별로 동시에 합친 뒤 다시 reduce"""
+    level = 0
+    while True:
+        joined = "\n\n".join(f"[{i + 1}]\n{p}" for i, p in enumerate(parts))
+        if len(parts) <= 2 or _tokens(joined) <= SUMMARY_REDUCE_TOKENS:
+            return await _complete(FINAL_REDUCE_PROMPT, joined, sem)
+        groups = _pack(parts, SUMMARY_REDUCE_TOKENS)
+        level += 1
+        print(f"[SUMMARIZE] reduce level {level}: {len(parts)} → {len(groups)}")
+        parts = await asyncio.gather(*[
+            _complete(REDUCE_PROMPT, "\n\n".join(f"[{i + 1}]\n{p}" for i, p in enumerate(g)), sem)
+            for g in groups
+        ])
+
+
+async def _aiter(pages: Iterable[str] | AsyncIterable[str]):
+    if hasattr(pages, "__aiter__"):
+        async for p in pages:
+            yield p
+    else:
+        for p in pages:
+            yield p
+
+
+async def summarize_pages(
+    pages: Iterable[str] | AsyncIterable[str],
+    on_progress: Callable[[int, int], Awaitable[None] | None] | None = None,
+) -> str:
+    """
+    페이지 텍스트(동기/비동기 iterable) → 한국어 요약
+    페이지가 들어오는 대로 chunk 를 만들어 바로 map 작업을 시작한다.
+    on_progress(done, total) : chunk 하나 끝날 때마다 호출 (total 은 그 시점까지 만들어진 chunk 수)
+    문서에 텍스트가 없으면 "" 반환
+    """
+    sem = asyncio.Semaphore(SUMMARY_CONCURRENCY)
+    chunker = TextChunker()
+    chunks: list[str] = []
+    tasks: list[asyncio.Task] = []
+    done = 0
+    started = time.perf_counter()
+
+    async def _map(idx: int, chunk: str) -> str:
+        nonlocal done
+        t0 = time.perf_counter()
+        out = await _complete(MAP_PROMPT, chunk, sem)
+        done += 1
+        print(f"[SUMMARIZE] chunk {idx + 1} done ({done}/{len(chunks)}, "
+              f"{_tokens(chunk)} tokens, {time.perf_counter() - t0:.1f}s)")
+        if on_progress:
+            r = on_progress(done, len(chunks))
+            if asyncio.iscoroutine(r):
+                await r
+        return out
+
+    held: str | None = None    # 첫 chunk — 문서가 chunk 하나뿐이면 map 없이 바로 최종 요약
+
+    def _feed(new_chunks: list[str]):
+        nonlocal held
+        for c in new_chunks:
+            if held is None and not chunks:
+                held = c
+                continue
+            if held is not None:
+                first, held = held, None
+                _feed_one(first)
+            _feed_one(c)
+
+    def _feed_one(c: str):
+        chunks.append(c)
+        tasks.append(asyncio.create_task(_map(len(chunks) - 1, c)))
+
+    try:
+        async for page in _aiter(pages):
+            _feed(chunker.add_page(page))
+        _feed(chunker.flush())
+
+        if not chunks:
+            if held is None:
+                return ""
+            print(f"[SUMMARIZE] single chunk ({_tokens(held)} tokens)")
+            return await _complete(FINAL_PROMPT, held, sem)
+
+        print(f"[SUMMARIZE] {len(chunks)} chunks → map (concurrency={SUMMARY_CONCURRENCY})")
+        partials = await asyncio.gather(*tasks)
+    except BaseException:
+        for t in tasks:
+            t.cancel()
+        raise
+
+    summary = await _reduce(list(partials), sem)
+    print(f"[SUMMARIZE] done: {len(chunks)} chunks in {time.perf_counter() - started:.1f}s")
+    return summary
@@ -0,0 +1,90 @@
+# utils/summary_cache.py
+import os, json, time, hashlib, tempfile
+
+SUMMARY_CACHE_DIR       = os.getenv("SUMMARY_CACHE_DIR", os.path.join(os.path.dirname(os.path.dirname(__file__)), "summary_cache"))
+SUMMARY_CACHE_MAX_BYTES = int(os.getenv("SUMMARY_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+
+
+class SummaryCache:
+    """
+    업로드 파일 요약 디스크 캐시 (같은 파일 재업로드 → 추출/LLM 호출 생략)
+    - text-<sha256>              : 추출된 페이지 텍스트 (프롬프트와 무관하므로 파일 해시만으로)
+    - summary-<sha256>-<version> : 최종 요약 (프롬프트/모델 버전이 바뀌면 자연히 miss)
+    - 전체 크기가 max_bytes 를 넘으면 가장 오래 안 쓴(mtime) 파일부터 삭제
+    여러 워커가 같은 디렉터리를 써도 되도록 임시 파일 → os.replace 로 원자적으로 기록
+    """
+    def __init__(self, root: str = SUMMARY_CACHE_DIR, max_bytes: int = SUMMARY_CACHE_MAX_BYTES):
+        self.root = root
+        self.max_bytes = max_bytes
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.root, name + ".json")
+
+    @staticmethod
+    def _version_tag(version: str) -> str:
+        return hashlib.sha1(version.encode()).hexdigest()[:12]
+
+    def _read(self, name: str) -> dict | None:
+        path = self._path(name)
+        try:
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        try:
+            os.utime(path)      # LRU 용 접근 시각 갱신
+        except OSError:
+            pass
+        return data
+
+    def _write(self, name: str, data: dict):
+        os.makedirs(self.root, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.root, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp, self._path(name))
+        except BaseException:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            raise
+        self._evict()
+
+    def get_text(self, sha256: str) -> list[str] | None:
+        data = self._read(f"text-{sha256}")
+        return data["pages"] if data else None
+
+    def put_text(self, sha256: str, pages: list[str]):
+        self._write(f"text-{sha256}", {"pages": pages, "created_at": time.time()})
+
+    def get_summary(self, sha256: str, version: str) -> str | None:
+        data = self._read(f"summary-{sha256}-{self._version_tag(version)}")
+        return data["summary"] if data else None
+
+    def put_summary(self, sha256: str, version: str, summary: str):
+        self._write(f"summary-{sha256}-{self._version_tag(version)}",
+                    {"summary": summary, "version": version, "created_at": time.time()})
+
+    def _evict(self):
+        """전체 크기가 max_bytes 를 넘으면 오래된 것부터 90% 까지 삭제"""
+        try:
+            entries = [e for e in os.scandir(self.root) if e.is_file() and e.name.endswith(".json")]
+        except FileNotFoundError:
+            return
+        stats = [(e.stat().st_mtime, e.stat().st_size, e.path) for e in entries]
+        total = sum(size for _, size, _ in stats)
+        if total <= self.max_bytes:
+            return
+        target = int(self.max_bytes * 0.9)
+        for _, size, path in sorted(stats):
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            if total <= target:
+                break
+        print(f"[SUMMARY_CACHE] evicted → {total} bytes")
+
+
+summary_cache = SummaryCache()
@@ -0,0 +1,22 @@
+# utils/tokens.py
+from functools import lru_cache
+import tiktoken
+
+
+@lru_cache(maxsize=8)
+def _encoding(model: str):
+    try:
+        return tiktoken.encoding_for_model(model)
+    except Exception:
+        try:
+            return tiktoken.get_encoding("cl100k_base")
+        except Exception:
+            return None   # BPE 파일을 받을 수 없는 환경 → 근사치 사용
+
+
+def count_tokens(text: str, model: str = "gpt-3.5-turbo") -> int:
+    """text 의 토큰 수 (tiktoken 을 못 쓰면 글자수 기반 근사치)"""
+    enc = _encoding(model)
+    if enc is None:
+        return len(text) // 3 + 1
+    return len(enc.encode(text))
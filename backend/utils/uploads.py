@@ -0,0 +1,113 @@
+# utils/uploads.py
+"""
+업로드 파일 스트리밍 처리 — 전체를 메모리에 올리지 않고 청크 단위로 해시/크기 검사
+- spool_to_tempfile : 임시 파일로 복사하면서 sha256 계산 (추출기에 경로로 전달)
+- hash_upload       : 제자리에서 sha256 계산 후 처음으로 되감기 (file.file 을 그대로 전달)
+- iter_text_blocks  : 텍스트 업로드를 UTF-8 로 조금씩 디코딩해 문단 경계 블록으로 (요약 파이프라인 입력)
+한도를 넘으면 읽는 도중 바로 UploadTooLarge (라우터에서 413 으로 변환)
+"""
+import os, codecs, hashlib, tempfile
+from typing import AsyncIterator, Callable, BinaryIO, Iterator
+from fastapi import UploadFile
+from fastapi.concurrency import run_in_threadpool
+
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+UPLOAD_TEXT_BLOCK_CHARS = 64 * 1024     # iter_text_blocks 블록 목표 크기(글자)
+
+
+class UploadTooLarge(ValueError):
+    def __init__(self, limit: int):
+        super().__init__(f"Upload exceeds {limit} bytes")
+        self.limit = limit
+
+
+def _check_declared_size(file: UploadFile, max_bytes: int):
+    """multipart 파서가 알려준 크기로 먼저 거름 (읽기 전에 거절)"""
+    size = getattr(file, "size", None)
+    if size is not None and size > max_bytes:
+        raise UploadTooLarge(max_bytes)
+
+
+def _hash_stream(src: BinaryIO, max_bytes: int,
+                 sink: Callable[[bytes], object] | None = None) -> tuple[str, int]:
+    h = hashlib.sha256()
+    total = 0
+    while chunk := src.read(UPLOAD_CHUNK_SIZE):
+        total += len(chunk)
+        if total > max_bytes:
+            raise UploadTooLarge(max_bytes)
+        h.update(chunk)
+        if sink is not None:
+            sink(chunk)
+    return h.hexdigest(), total
+
+
+async def spool_to_tempfile(file: UploadFile, max_bytes: int, suffix: str = "") -> tuple[str, str, int]:
+    """
+    업로드 → 임시 파일 (path, sha256, size). 임시 파일 삭제는 호출 측 책임
+    실패하면 임시 파일은 여기서 지움
+    """
+    _check_declared_size(file, max_bytes)
+    tmp = tempfile.NamedTemporaryFile(suffix=suffix, delete=False)
+    try:
+        with tmp:
+            digest, size = await run_in_threadpool(_hash_stream, file.file, max_bytes, tmp.write)
+    except BaseException:
+        os.unlink(tmp.name)
+        raise
+    return tmp.name, digest, size
+
+
+async def hash_upload(file: UploadFile, max_bytes: int) -> tuple[str, int]:
+    """업로드를 복사 없이 훑어 (sha256, size) 계산 후 file.file 을 처음으로 되감음"""
+    _check_declared_size(file, max_bytes)
+    await file.seek(0)
+    digest, size = await run_in_threadpool(_hash_stream, file.file, max_bytes)
+    await file.seek(0)
+    return digest, size
+
+
+def _text_lines(src: BinaryIO) -> Iterator[str]:
+    """
+    바이너리 스트림 → UTF-8 줄 단위 (잘못된 바이트는 무시, 줄바꿈 포함)
+    3.10 의 SpooledTemporaryFile 은 io.TextIOWrapper 로 감쌀 수 없어 증분 디코더 사용
+    (여러 바이트 글자가 읽기 경계에 걸려도 decoder 가 이어 붙임)
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="ignore")
+    pending = ""
+    src.seek(0)
+    while chunk := src.read(UPLOAD_CHUNK_SIZE):
+        lines = (pending + decoder.decode(chunk)).split("\n")
+        pending = lines.pop()
+        for line in lines:
+            yield line + "\n"
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending
+
+
+def _text_blocks(src: BinaryIO, block_chars: int) -> Iterator[str]:
+    """
+    줄들을 block_chars 이상 모은 뒤 빈 줄(문단 경계)에서 자름. 빈 줄 없이 4배를 넘으면 줄 경계에서 자름
+    """
+    buf: list[str] = []
+    size = 0
+    for line in _text_lines(src):
+        buf.append(line)
+        size += len(line)
+        if size >= block_chars and (not line.strip() or size >= block_chars * 4):
+            yield "".join(buf)
+            buf, size = [], 0
+    if buf:
+        yield "".join(buf)
+
+
+async def iter_text_blocks(file: UploadFile,
+                           block_chars: int = UPLOAD_TEXT_BLOCK_CHARS) -> AsyncIterator[str]:
+    """업로드(file.file)를 처음부터 블록 단위로 디코딩 — 읽기는 스레드풀에서, 전체를 한 번에 올리지 않음"""
+    blocks = _text_blocks(file.file, block_chars)
+    try:
+        while (block := await run_in_threadpool(next, blocks, None)) is not None:
+            yield block
+    finally:
+        blocks.close()
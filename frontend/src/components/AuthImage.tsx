@@ -0,0 +1,38 @@
+// src/components/AuthImage.tsx
+import { useEffect, useState, ImgHTMLAttributes } from "react";
+import { fetchWithAuth } from "../utils/api";
+
+type Props = ImgHTMLAttributes<HTMLImageElement> & { src: string };
+
+/**
+ * 인증이 필요한 API 이미지(/chat/images/...)를 토큰과 함께 받아 blob URL 로 렌더
+ *  - data: URL 은 그대로 사용 (레거시 base64 썸네일)
+ */
+export default function AuthImage({ src, ...rest }: Props) {
+  const [url, setUrl] = useState<string | undefined>(
+    src.startsWith("data:") ? src : undefined,
+  );
+
+  useEffect(() => {
+    if (src.startsWith("data:")) {
+      setUrl(src);
+      return;
+    }
+    let alive = true;
+    let objectUrl: string | undefined;
+    fetchWithAuth<Response>(src, { raw: true })
+      .then(res => res.blob())
+      .then(blob => {
+        if (!alive) return;
+        objectUrl = URL.createObjectURL(blob);
+        setUrl(objectUrl);
+      })
+      .catch(() => { /* 썸네일 실패는 조용히 무시 */ });
+    return () => {
+      alive = false;
+      if (objectUrl) URL.revokeObjectURL(objectUrl);
+    };
+  }, [src]);
+
+  return <img src={url} {...rest} />;
+}
@@ -22,6 +22,7 @@ import AutoSizer from "react-virtualized-auto-sizer";
 import type { Size } from "react-virtualized-auto-sizer";
 import { fetchWithAuth } from "../utils/api";
 import ProfilingDialog from "../components/ProfilingDialog";
+import AuthImage from "../components/AuthImage";
 import { Dialog as MuiDialog, /* … */ } from "@mui/material";
 
 /* ---------- types ---------- */
@@ -57,7 +58,8 @@ interface AgendaEvent {
 }
 interface ImageThumb {
   image_id: number;
-  thumb: string;          // ← 서버 키 그대로
+  thumb?: string;         // ← (레거시) base64 썸네일
+  thumb_url?: string;     // ← 썸네일 API 경로 (인증 필요)
 }
 
 /* =================================================================== */
@@ -415,8 +417,8 @@ export default function ChatLayout() {
             <Box sx={{ mt: 1, display:"flex", gap:1, flexWrap:"wrap" }}>
               {m.images.map(img => (
                 <Box key={img.image_id}>
-                  <img
-                    src={`data:image/webp;base64,${img.thumb}`}
+                  <AuthImage
+                    src={img.thumb_url ?? `data:image/webp;base64,${img.thumb}`}
                     width={128}
                     height={128}
                     style={{
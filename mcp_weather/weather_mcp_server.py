@@ -1,9 +1,22 @@
 # weather_mcp_server.py
-import json, socket, threading, requests, time, datetime as dt
+import os, json, time, asyncio, datetime as dt
+from collections import OrderedDict
+import httpx
 
 HOST = "0.0.0.0"
 PORT = 7001
 
+# ── 부하 제한(backpressure) ───────────────────────────
+MAX_CONNECTIONS   = int(os.getenv("MCP_MAX_CONNECTIONS", "4096"))   # 동시 클라이언트 수
+MAX_INFLIGHT_CONN = int(os.getenv("MCP_MAX_INFLIGHT_CONN", "32"))   # 연결당 동시 처리 요청
+MAX_UPSTREAM      = int(os.getenv("MCP_MAX_UPSTREAM", "64"))        # open-meteo 동시 호출
+MAX_FRAME_BYTES   = int(os.getenv("MCP_MAX_FRAME_BYTES", "65536"))  # 요청 1개 최대 크기
+
+# ── 캐시 설정 ─────────────────────────────────────────
+GEO_CACHE_SIZE    = int(os.getenv("MCP_GEO_CACHE_SIZE", "2048"))
+WEATHER_CACHE_TTL = float(os.getenv("MCP_WEATHER_TTL", "120"))      # 초
+WEATHER_CACHE_SIZE = int(os.getenv("MCP_WEATHER_CACHE_SIZE", "4096"))
+
 TOOL_SPEC = [{
   "name": "get_weather",
   "description": "도시명으로 현재 기온/조건 조회",
@@ -17,24 +30,83 @@ TOOL_SPEC = [{
   }
 }]
 
-def resolve_city(city: str):
-    # 매우 단순: Open-Meteo geocoding → lat,lon
-    url = "https://geocoding-api.open-meteo.com/v1/search"
-    r = requests.get(url, params={"name": city, "count": 1, "language": "en"})
-    d = r.json()
-    if not d.get("results"):
-        raise ValueError(f"City '{city}' not found")
-    item = d["results"][0]
-    return item["latitude"], item["longitude"], item["name"]
-
-def fetch_weather(lat, lon, units):
-    params = {
-        "latitude": lat,
-        "longitude": lon,
-        "current_weather": True
-    }
-    r = requests.get("https://api.open-meteo.com/v1/forecast", params=params, timeout=7)
-    cw = r.json().get("current_weather", {})
+
+class LRUCache:
+    """TTL(선택) 이 있는 간단 LRU. 이벤트 루프 단일 스레드에서만 사용."""
+    def __init__(self, maxsize: int, ttl: float | None = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict = OrderedDict()
+        self._inflight: dict = {}     # 같은 키 동시 조회 → 업스트림 호출 1번으로 합치기
+
+    def get(self, key):
+        item = self._data.get(key)
+        if item is None:
+            return None
+        value, expires = item
+        if expires is not None and expires < time.monotonic():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    def put(self, key, value):
+        expires = time.monotonic() + self.ttl if self.ttl else None
+        self._data[key] = (value, expires)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    async def get_or_load(self, key, loader):
+        value = self.get(key)
+        if value is not None:
+            return value
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(loader())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _t: self._inflight.pop(key, None))
+        value = await asyncio.shield(task)
+        self.put(key, value)
+        return value
+
+
+geo_cache = LRUCache(GEO_CACHE_SIZE)
+weather_cache = LRUCache(WEATHER_CACHE_SIZE, ttl=WEATHER_CACHE_TTL)
+
+_http: httpx.AsyncClient | None = None
+_upstream_sem: asyncio.Semaphore | None = None
+
+
+async def _get_json(url: str, params: dict) -> dict:
+    async with _upstream_sem:
+        r = await _http.get(url, params=params)
+    r.raise_for_status()
+    return r.json()
+
+
+async def resolve_city(city: str):
+    # 매우 단순: Open-Meteo geocoding → lat,lon (도시명 LRU 캐시)
+    async def load():
+        d = await _get_json("https://geocoding-api.open-meteo.com/v1/search",
+                            {"name": city, "count": 1, "language": "en"})
+        if not d.get("results"):
+            raise ValueError(f"City '{city}' not found")
+        item = d["results"][0]
+        return item["latitude"], item["longitude"], item["name"]
+    return await geo_cache.get_or_load(city.strip().lower(), load)
+
+
+async def fetch_weather(lat, lon, units):
+    # 현재 날씨는 위경도 소수 둘째 자리(~1km) 단위로 짧게 캐시 (섭씨 원본 보관)
+    key = (round(lat, 2), round(lon, 2))
+
+    async def load():
+        d = await _get_json("https://api.open-meteo.com/v1/forecast",
+                            {"latitude": key[0], "longitude": key[1], "current_weather": True})
+        return d.get("current_weather", {})
+    cw = await weather_cache.get_or_load(key, load)
+
     temp_c = cw.get("temperature")
     # 단순 변환
     if units == "imperial":
@@ -49,7 +121,8 @@ def fetch_weather(lat, lon, units):
         "raw": cw
     }
 
-def handle_rpc(req):
+
+async def handle_rpc(req):
     method = req.get("method")
     if method == "handshake":
         return {"protocol": "mcp/1", "capabilities": {"tools": TOOL_SPEC}}
@@ -60,9 +133,9 @@ def handle_rpc(req):
         args = req["params"].get("args", {})
         if name == "get_weather":
             city = args["location"]
-            units = args.get("units","metric")
-            lat, lon, label = resolve_city(city)
-            data = fetch_weather(lat, lon, units)
+            units = args.get("units") or "metric"
+            lat, lon, label = await resolve_city(city)
+            data = await fetch_weather(lat, lon, units)
             return {"result": {
                 "location": label,
                 "units": units,
@@ -74,37 +147,86 @@ def handle_rpc(req):
         raise ValueError(f"Unknown tool {name}")
     return {"error": "unknown_method"}
 
-def client_thread(conn, addr):
-    buf = b""
-    while True:
-        chunk = conn.recv(65536)
-        if not chunk: break
-        buf += chunk
-        # 간단 프로토콜: \n\n 구분 (데모용)
-        while b"\n\n" in buf:
-            raw, buf = buf.split(b"\n\n", 1)
-            if not raw.strip(): continue
+
+async def _respond(raw: bytes, writer: asyncio.StreamWriter, write_lock: asyncio.Lock, sem: asyncio.Semaphore):
+    try:
+        try:
+            req = json.loads(raw.decode())
+            resp_payload = {"jsonrpc":"2.0","id":req.get("id")}
             try:
-                req = json.loads(raw.decode())
-                resp_payload = {"jsonrpc":"2.0","id":req.get("id")}
-                try:
-                    result = handle_rpc(req)
-                    resp_payload["result"] = result
-                except Exception as e:
-                    resp_payload["error"] = {"message": str(e)}
-                conn.sendall((json.dumps(resp_payload)+"\n\n").encode())
+                resp_payload["result"] = await handle_rpc(req)
             except Exception as e:
-                conn.sendall(json.dumps({"jsonrpc":"2.0","error":{"message":str(e)}}).encode()+b"\n\n")
-    conn.close()
+                resp_payload["error"] = {"message": str(e)}
+        except Exception as e:
+            resp_payload = {"jsonrpc":"2.0","error":{"message":str(e)}}
+        async with write_lock:
+            writer.write((json.dumps(resp_payload)+"\n\n").encode())
+            await writer.drain()
+    except (ConnectionError, OSError):
+        pass
+    finally:
+        sem.release()
+
+
+_conn_sem: asyncio.Semaphore | None = None
+
+
+async def client_conn(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+    # 연결 수 상한에 걸리면 빈 자리가 날 때까지 대기 (읽지 않으므로 TCP 레벨에서 역압)
+    async with _conn_sem:
+        inflight = asyncio.Semaphore(MAX_INFLIGHT_CONN)
+        write_lock = asyncio.Lock()
+        tasks: set[asyncio.Task] = set()
+        buf = b""
+        try:
+            while True:
+                chunk = await reader.read(65536)
+                if not chunk: break
+                buf += chunk
+                # 간단 프로토콜: \n\n 구분 (데모용)
+                while b"\n\n" in buf:
+                    raw, buf = buf.split(b"\n\n", 1)
+                    if not raw.strip(): continue
+                    # 연결당 동시 요청 상한 → 넘으면 읽기를 멈춰 클라이언트를 늦춘다
+                    await inflight.acquire()
+                    t = asyncio.create_task(_respond(raw, writer, write_lock, inflight))
+                    tasks.add(t)
+                    t.add_done_callback(tasks.discard)
+                if len(buf) > MAX_FRAME_BYTES:
+                    async with write_lock:
+                        writer.write(json.dumps({"jsonrpc":"2.0","error":{"message":"frame too large"}}).encode()+b"\n\n")
+                        await writer.drain()
+                    break
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+        except (ConnectionError, OSError):
+            pass
+        finally:
+            for t in tasks:
+                t.cancel()
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except (ConnectionError, OSError):
+                pass
+
 
-def main():
-    s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-    s.bind((HOST, PORT))
-    s.listen()
+async def main():
+    global _http, _upstream_sem, _conn_sem
+    _upstream_sem = asyncio.Semaphore(MAX_UPSTREAM)
+    _conn_sem = asyncio.Semaphore(MAX_CONNECTIONS)
+    # open-meteo 로의 keep-alive 연결 풀
+    _http = httpx.AsyncClient(
+        timeout=7.0,
+        limits=httpx.Limits(max_connections=MAX_UPSTREAM, max_keepalive_connections=MAX_UPSTREAM),
+    )
+    server = await asyncio.start_server(client_conn, HOST, PORT, backlog=1024)
     print(f"[MCP-Weather] listening on {PORT}")
-    while True:
-        c,a = s.accept()
-        threading.Thread(target=client_thread, args=(c,a), daemon=True).start()
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await _http.aclose()
 
 if __name__ == "__main__":
-    main()
+    asyncio.run(main())